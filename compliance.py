@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+
+# Title: compliance.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Check interface templates against any number of rules in one pass over the
+#          config, instead of a new script with two hard-coded search strings for every
+#          question. All the rule text is compiled into one Aho-Corasick matcher, so
+#          each config line is scanned once no matter how many rules there are.
+#
+#          Rules file, one rule per line ('#' starts a comment):
+#               <template glob> | require | <line>
+#               <template glob> | forbid  | <line>
+#               <template glob> | order   | <first line> | <second line>
+#          e.g.
+#               *VOIP* | require | switchport block unicast
+#
+#          Usage: ./compliance.py [rules file] [config dir]
+#               checks every configs/<switch>-running-config.txt (scpconfig.py) and
+#               writes a switch x template x rule matrix to compliance.csv
+#
+#          Template bodies are normalized and hashed as they're read, and each distinct
+#          body is only scanned once, so a fleet of identical templates costs about the
+#          same as one switch. template-variants.txt groups switches by which version
+#          of each template they carry, with the odd ones out listed by name.
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import os
+import sys
+import fnmatch
+import hashlib
+import collections
+import streamparse
+
+# Where the matrix goes
+REPORT_FILE = 'compliance.csv'
+# Where switches get grouped by template variant
+VARIANT_FILE = 'template-variants.txt'
+# Where scpconfig.py leaves full configs
+CONFIG_DIR = 'configs'
+
+# One compliance rule
+#   template -- glob for the template names it applies to, e.g. '*VOIP*'
+#   kind -- 'require', 'forbid' or 'order'
+#   texts -- the line, or for 'order' the line that has to come first and the one after
+Rule = collections.namedtuple('Rule', 'template kind texts')
+
+# What got_template.py has always checked
+VOIP_RULES = [
+        Rule('*VOIP*', 'require', ('switchport block unicast',)),
+        Rule('*VOIP*', 'require', ('service-policy input custom_voip_policy',))]
+# What got_template_adapted.py and got_resnet.py have always checked
+AGING_RULES = [
+        Rule('*VOIP*', 'require', ('switchport port-security aging time 1',)),
+        Rule('*VOIP*', 'require', ('switchport port-security aging type inactivity',))]
+
+# Short name for a rule, used as the matrix column header
+def rule_name(rule):
+    return rule.kind + ':' + ' >> '.join(rule.texts)
+
+# Read rules from a file
+# Parameters:
+#   path<String> = rules file
+#
+# Return:
+#   rules<Array[Rule]>
+def load_rules(path):
+    rules = []
+    f = open(path)
+    for n, line in enumerate(f, 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        fields = [x.strip() for x in line.split('|')]
+        if len(fields) < 3 or fields[1] not in ('require', 'forbid', 'order') or \
+                (fields[1] == 'order' and len(fields) != 4):
+            f.close()
+            raise ValueError("Bad rule on line %d of %s: %s" % (n, path, line))
+        rules.append(Rule(fields[0], fields[1], tuple(fields[2:])))
+    f.close()
+    return rules
+
+# Aho-Corasick automaton: finds every needle in a line in one pass over the line
+# Parameters:
+#   needles<Array[String]> = strings to look for
+class Matcher:
+    def __init__(self, needles):
+        self.needles = list(needles)
+        # goto[state] = {char: state}, out[state] = needle indexes that end here
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [set()]
+        for i, needle in enumerate(self.needles):
+            state = 0
+            for ch in needle:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(set())
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.out[state].add(i)
+
+        # Breadth first to fill in the failure links
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    # Every needle that shows up in a line
+    # Return:
+    #   found<Set[Int]> = needle indexes
+    def search(self, line):
+        found = set()
+        state = 0
+        goto = self.goto
+        fail = self.fail
+        for ch in line:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if self.out[state]:
+                found |= self.out[state]
+        return found
+
+# Needle hits for template bodies we've already scanned, shared by every parser in
+# the process so identical templates across the fleet are only scanned once
+#   (needles, body hash) -> {needle index: line number in the body}
+SEEN = {}
+# Matchers already built, needles -> Matcher
+MATCHERS = {}
+
+# Normalize a template body so cosmetic differences don't make a new variant
+# Parameters:
+#   lines<Array[String]> = lines under 'template NAME'
+#
+# Return:
+#   body<Array[String]> = stripped lines with runs of spaces squeezed, no blanks or '!'
+def normalize(lines):
+    body = []
+    for line in lines:
+        line = ' '.join(line.split())
+        if line and line != '!':
+            body.append(line)
+    return body
+
+# Hash of a normalized template body
+def body_hash(body):
+    return hashlib.sha1('\n'.join(body).encode()).hexdigest()
+
+# Parser that checks every template in a config against a set of rules
+# Works with streamparse.parse(), so it can run on output as it comes off the switch
+# or on a saved config
+# Parameters:
+#   rules<Array[Rule]> = rules to check
+class ComplianceCheck:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        needles = []
+        for r in self.rules:
+            for t in r.texts:
+                if t not in needles:
+                    needles.append(t)
+        self.needles = tuple(needles)
+        if self.needles not in MATCHERS:
+            MATCHERS[self.needles] = Matcher(needles)
+        self.matcher = MATCHERS[self.needles]
+        self.index = dict((t, i) for i, t in enumerate(needles))
+        # template name -> {needle index: first line number it showed up on}
+        self.templates = collections.OrderedDict()
+        # template name -> body hash
+        self.hashes = collections.OrderedDict()
+        # Bodies scanned here vs. found already scanned
+        self.scanned = 0
+        self.reused = 0
+        self.name = None
+        self.body = []
+
+    def feed(self, line):
+        if not line.strip():
+            return False
+        if line[0] not in ' \t':
+            # New top level block, only templates are interesting
+            self._finish()
+            fields = line.split()
+            if fields[0] == 'template' and len(fields) > 1:
+                self.name = fields[1]
+            return False
+        if self.name is not None:
+            self.body.append(line)
+        return False
+
+    # Hash the template we just finished reading, scan it only if it's new
+    def _finish(self):
+        if self.name is None:
+            return
+        body = normalize(self.body)
+        digest = body_hash(body)
+        key = (self.needles, digest)
+        seen = SEEN.get(key)
+        if seen is None:
+            seen = {}
+            for n, line in enumerate(body):
+                for i in self.matcher.search(line):
+                    seen.setdefault(i, n)
+            SEEN[key] = seen
+            self.scanned += 1
+        else:
+            self.reused += 1
+        self.templates[self.name] = seen
+        self.hashes[self.name] = digest
+        self.name = None
+        self.body = []
+
+    # Pass/fail of every rule on every template it applies to
+    # Return:
+    #   results<Dict{String: Dict{Rule: Boolean}}> = template -> rule -> passed
+    def result(self):
+        self._finish()
+        results = collections.OrderedDict()
+        for name, seen in self.templates.items():
+            checks = collections.OrderedDict()
+            for r in self.rules:
+                if not fnmatch.fnmatchcase(name, r.template):
+                    continue
+                at = [seen.get(self.index[t]) for t in r.texts]
+                if r.kind == 'require':
+                    checks[r] = at[0] is not None
+                elif r.kind == 'forbid':
+                    checks[r] = at[0] is None
+                else:
+                    checks[r] = at[0] is not None and at[1] is not None and at[0] < at[1]
+            if checks:
+                results[name] = checks
+        return results
+
+# Check one config's templates
+# Parameters:
+#   config<String> = running config or 'sh run | sec template' output
+#   rules<Array[Rule]> = rules to check
+#
+# Return:
+#   results<Dict{String: Dict{Rule: Boolean}}> = from ComplianceCheck.result()
+def check_config(config, rules):
+    return streamparse.parse(iter(config.replace('\r', '').split('\n')), ComplianceCheck(rules))
+
+# Check a set of configs, scanning each distinct template body once
+# Parameters:
+#   configs<Iterable[(String, String)]> = (switch, config text) pairs
+#   rules<Array[Rule]> = rules to check
+#
+# Return:
+#   results<Dict{String: Dict}> = switch -> check_config() result
+#   hashes<Dict{String: Dict{String: String}}> = switch -> template name -> body hash
+#   scanned<Int>, reused<Int> = template bodies scanned vs. answered from SEEN
+def check_fleet(configs, rules):
+    results = collections.OrderedDict()
+    hashes = collections.OrderedDict()
+    scanned = reused = 0
+    for switch, config in configs:
+        check = ComplianceCheck(rules)
+        results[switch] = streamparse.parse(iter(config.replace('\r', '').split('\n')), check)
+        hashes[switch] = check.hashes
+        scanned += check.scanned
+        reused += check.reused
+    return results, hashes, scanned, reused
+
+# Group switches by which version of each template they carry
+# Parameters:
+#   results<Dict{String: Dict}> = from check_fleet()
+#   hashes<Dict{String: Dict{String: String}}> = from check_fleet()
+#
+# Return:
+#   variants<Dict{String: Array[(String, Boolean, Array[String])]}> =
+#       template name -> (body hash, compliant, switches), most common variant first
+def variants(results, hashes):
+    groups = collections.OrderedDict()
+    for switch, templates in results.items():
+        for name, checks in templates.items():
+            key = (hashes[switch][name], all(checks.values()))
+            groups.setdefault(name, collections.OrderedDict()).setdefault(key, []).append(switch)
+    out = collections.OrderedDict()
+    for name, found in groups.items():
+        out[name] = sorted(((h, ok, sw) for (h, ok), sw in found.items()),
+                key=lambda v: -len(v[2]))
+    return out
+
+# Write the variant report, switches are only listed for the less common variants
+def write_variants(found, path=VARIANT_FILE):
+    f = open(path, 'w')
+    for name, versions in found.items():
+        f.write("%s: %d variant(s)\n" % (name, len(versions)))
+        for n, (digest, ok, switches) in enumerate(versions):
+            f.write("  %s  %-14s %5d switches" %
+                    (digest[:12], 'compliant' if ok else 'NOT compliant', len(switches)))
+            if n == 0:
+                f.write("  (most common)\n")
+            else:
+                f.write(": " + ' '.join(switches) + '\n')
+    f.close()
+
+# One line answer in the format got_template.py has always written
+# Parameters:
+#   results<Dict{String: Dict{Rule: Boolean}}> = from check_config()
+#
+# Return:
+#   answer<String> = 'NAME: yes NAME: no ...'
+def yes_no(results):
+    return ''.join(name + (": yes " if all(checks.values()) else ": no ")
+            for name, checks in results.items())
+
+# The required lines each template has, run together the way got_template_adapted.py
+# and got_resnet.py have always written them
+# Parameters:
+#   results<Dict{String: Dict{Rule: Boolean}}> = from check_config()
+#
+# Return:
+#   answer<String> = every passing 'require' line, template after template
+def found_lines(results):
+    return ''.join(r.texts[0] for checks in results.values()
+            for r, passed in checks.items() if r.kind == 'require' and passed)
+
+# Build the switch x template x rule matrix
+# Parameters:
+#   results<Dict{String: Dict{String: Dict{Rule: Boolean}}}> = switch -> check_config()
+#   rules<Array[Rule]> = rules, in column order
+#
+# Return:
+#   rows<Array[Array[String]]> = header row, then one row per switch and template
+def matrix(results, rules):
+    rows = [['switch', 'template'] + [rule_name(r) for r in rules] + ['compliant']]
+    for switch, templates in results.items():
+        if not templates:
+            rows.append([switch, '(none)'] + [''] * len(rules) + [''])
+        for name, checks in templates.items():
+            cells = []
+            for r in rules:
+                cells.append('' if r not in checks else ('PASS' if checks[r] else 'FAIL'))
+            rows.append([switch, name] + cells + ['yes' if all(checks.values()) else 'no'])
+    return rows
+
+# Write the matrix as CSV
+def write_matrix(rows, path=REPORT_FILE):
+    f = open(path, 'w')
+    for row in rows:
+        f.write(','.join('"' + c.replace('"', '""') + '"' if ',' in c or '"' in c else c
+                for c in row) + '\n')
+    f.close()
+
+# Main program logic
+#
+def main():
+    rules = load_rules(sys.argv[1]) if len(sys.argv) > 1 else VOIP_RULES + AGING_RULES
+    config_dir = sys.argv[2] if len(sys.argv) > 2 else CONFIG_DIR
+    if not os.path.isdir(config_dir):
+        print("!ERROR: No configs in " + config_dir + ", collect them with scpconfig.py first")
+        sys.exit(1)
+
+    suffix = '-running-config.txt'
+    names = sorted(n for n in os.listdir(config_dir) if n.endswith(suffix))
+
+    def configs():
+        for name in names:
+            f = open(os.path.join(config_dir, name))
+            text = f.read()
+            f.close()
+            yield name[:-len(suffix)], text
+
+    results, hashes, scanned, reused = check_fleet(configs(), rules)
+    rows = matrix(results, rules)
+    write_matrix(rows)
+    found = variants(results, hashes)
+    write_variants(found)
+    bad = len([r for r in rows[1:] if r[-1] == 'no'])
+    print("*Checked %d switches against %d rules, %d templates out of compliance" %
+            (len(results), len(rules), bad))
+    print("*%d distinct template bodies scanned, %d answered from a switch already checked" %
+            (scanned, reused))
+    for name, versions in found.items():
+        if len(versions) > 1:
+            print("-%s has %d variants, %d switches differ from the most common one" %
+                    (name, len(versions), sum(len(v[2]) for v in versions[1:])))
+    print("*Matrix written to " + REPORT_FILE + ", variants to " + VARIANT_FILE)
+
+# Execute the program
+if __name__ == "__main__":
+    main()
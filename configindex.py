@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+
+# Title: configindex.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Answer "which switches have this line" from the configs scpconfig.py already
+#          collected, instead of writing another got_voip.py and sweeping the fleet.
+#          Every config line is indexed (line -> switch and section it's under) so a
+#          substring or regex search only has to look at each distinct line once, and
+#          the index files are memory mapped so a query doesn't read them all in.
+#
+#          The index is a set of segments. 'update' only reads configs that changed
+#          since the last run and writes them as a new segment; a switch's newest
+#          segment wins. Once there are too many segments they're merged back into one.
+#
+#          Usage:
+#               ./configindex.py update [config dir]    index new and changed configs
+#               ./configindex.py query <text>           switches with a line containing text
+#               ./configindex.py regex <pattern>        switches with a line matching pattern
+#               ./configindex.py compact [config dir]   rebuild the index as one segment
+#          add -l after query/regex to only list the switches
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import array
+import bisect
+import shutil
+
+# Where scpconfig.py leaves full configs
+CONFIG_DIR = 'configs'
+# Where the index lives
+INDEX_DIR = 'config-index'
+MANIFEST = 'manifest.json'
+SUFFIX = '-running-config.txt'
+# Merge everything back into one segment after this many
+MAX_SEGMENTS = 8
+
+# Read a config and group its lines by section
+# Parameters:
+#   text<String> = running config
+#
+# Return:
+#   entries<Array[(String, String)]> = (line, section) for every line, section is the
+#       top level line it sits under ('' for top level lines themselves)
+def config_lines(text):
+    entries = []
+    section = ''
+    for line in text.replace('\r', '').split('\n'):
+        if not line.strip() or line.strip() == '!':
+            continue
+        if line[0] not in ' \t':
+            section = line.strip()
+            entries.append((section, ''))
+        else:
+            entries.append((line.strip(), section))
+    return entries
+
+# Write one segment
+# Parameters:
+#   path<String> = segment directory
+#   configs<Dict{String: String}> = switch -> config text
+#
+# Segment files:
+#   lines.txt -- every distinct line once, sorted, newline separated
+#   lineoffs.bin -- uint64 start offset of each line in lines.txt, plus the end
+#   postoffs.bin -- uint64 start of each line's postings, plus the end
+#   postings.bin -- uint32 (switch, section) pairs
+#   switches.txt, sections.txt -- names for those numbers
+def write_segment(path, configs):
+    switches = sorted(configs)
+    sections = {'': 0}
+    postings = {}
+    for n, s in enumerate(switches):
+        for line, section in config_lines(configs[s]):
+            if section not in sections:
+                sections[section] = len(sections)
+            post = postings.setdefault(line, [])
+            pair = (n, sections[section])
+            # Same line twice in the same section only needs one entry
+            if not post or post[-1] != pair:
+                post.append(pair)
+
+    os.makedirs(path, exist_ok=True)
+    lineoffs = array.array('Q')
+    postoffs = array.array('Q')
+    pairs = array.array('I')
+    f = open(os.path.join(path, 'lines.txt'), 'wb')
+    pos = 0
+    for line in sorted(postings):
+        data = line.encode('utf-8', errors='replace') + b'\n'
+        f.write(data)
+        lineoffs.append(pos)
+        pos += len(data)
+        postoffs.append(len(pairs) // 2)
+        for pair in postings[line]:
+            pairs.extend(pair)
+    f.close()
+    lineoffs.append(pos)
+    postoffs.append(len(pairs) // 2)
+    for name, arr in (('lineoffs.bin', lineoffs), ('postoffs.bin', postoffs), ('postings.bin', pairs)):
+        f = open(os.path.join(path, name), 'wb')
+        arr.tofile(f)
+        f.close()
+    f = open(os.path.join(path, 'switches.txt'), 'w')
+    f.write('\n'.join(switches))
+    f.close()
+    f = open(os.path.join(path, 'sections.txt'), 'w')
+    f.write('\n'.join(sorted(sections, key=sections.get)))
+    f.close()
+
+# Map a file read-only, None for an empty file (mmap can't map those)
+def _map(path):
+    f = open(path, 'rb')
+    try:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+
+# One segment, memory mapped
+# Parameters:
+#   path<String> = segment directory
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        self.text = _map(os.path.join(path, 'lines.txt'))
+        self.maps = [_map(os.path.join(path, n)) for n in ('lineoffs.bin', 'postoffs.bin', 'postings.bin')]
+        self.lineoffs, self.postoffs, self.pairs = [
+                memoryview(m).cast(c) if m is not None else []
+                for m, c in zip(self.maps, ('Q', 'Q', 'I'))]
+        f = open(os.path.join(path, 'switches.txt'))
+        self.switches = f.read().split('\n')
+        f.close()
+        self.sections = None
+
+    # Section names are only read in if a query needs them
+    def section(self, n):
+        if self.sections is None:
+            f = open(os.path.join(self.path, 'sections.txt'))
+            self.sections = f.read().split('\n')
+            f.close()
+        return self.sections[n]
+
+    # Line numbers that contain some bytes or match a regex
+    # Parameters:
+    #   text<Bytes> = substring to look for, or
+    #   regex<re.Pattern> = compiled bytes pattern
+    def find(self, text=None, regex=None):
+        if self.text is None:
+            return
+        last = -1
+        if regex is not None:
+            positions = (m.start() for m in regex.finditer(self.text))
+        else:
+            positions = self._find_all(text)
+        for pos in positions:
+            n = bisect.bisect_right(self.lineoffs, pos) - 1
+            if n != last and n < len(self.lineoffs) - 1:
+                last = n
+                yield n
+
+    def _find_all(self, text):
+        pos = self.text.find(text)
+        while pos != -1:
+            # Skip to the next line, one hit per line is enough
+            end = self.text.find(b'\n', pos)
+            yield pos
+            pos = self.text.find(text, end + 1) if end != -1 else -1
+
+    # The text of line n
+    def line(self, n):
+        return self.text[self.lineoffs[n]:self.lineoffs[n + 1] - 1].decode('utf-8', errors='replace')
+
+    # (switch, section) pairs for line n
+    def postings(self, n):
+        for i in range(self.postoffs[n], self.postoffs[n + 1]):
+            yield self.switches[self.pairs[2 * i]], self.pairs[2 * i + 1]
+
+    def close(self):
+        self.lineoffs = self.postoffs = self.pairs = []
+        for m in self.maps + [self.text]:
+            if m is not None:
+                m.close()
+
+# Read the manifest
+# Return:
+#   manifest<Dict> =
+#       switches -- switch -> {'mtime', 'size', 'segment'} of the config indexed
+#       next -- number for the next segment
+def load_manifest(index_dir=INDEX_DIR):
+    path = os.path.join(index_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {'switches': {}, 'next': 0}
+    f = open(path)
+    manifest = json.load(f)
+    f.close()
+    return manifest
+
+# Write the manifest, via a temp file so a query never sees half of one
+def save_manifest(manifest, index_dir=INDEX_DIR):
+    tmp = os.path.join(index_dir, MANIFEST + '.tmp')
+    f = open(tmp, 'w')
+    json.dump(manifest, f)
+    f.close()
+    os.replace(tmp, os.path.join(index_dir, MANIFEST))
+
+# Segment numbers still holding the newest copy of some switch
+def live_segments(manifest):
+    return sorted(set(v['segment'] for v in manifest['switches'].values()))
+
+# Every stored config and its mtime and size
+def scan_configs(config_dir=CONFIG_DIR):
+    found = {}
+    for name in os.listdir(config_dir):
+        if name.endswith(SUFFIX):
+            st = os.stat(os.path.join(config_dir, name))
+            found[name[:-len(SUFFIX)]] = (st.st_mtime, st.st_size)
+    return found
+
+def _read(config_dir, switch):
+    f = open(os.path.join(config_dir, switch + SUFFIX), errors='replace')
+    text = f.read()
+    f.close()
+    return text
+
+# Drop segment directories nothing points at any more
+def _prune(manifest, index_dir):
+    keep = set('seg%06d' % n for n in live_segments(manifest))
+    for name in os.listdir(index_dir):
+        if name.startswith('seg') and name not in keep:
+            shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+# Index every config that's new or changed since the last update
+# Parameters:
+#   config_dir<String> = where the configs are
+#   index_dir<String> = where the index is
+#
+# Return:
+#   changed<Int> = configs indexed, removed<Int> = switches whose config is gone
+def update(config_dir=CONFIG_DIR, index_dir=INDEX_DIR):
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = load_manifest(index_dir)
+    found = scan_configs(config_dir)
+    known = manifest['switches']
+
+    changed = [s for s, (mtime, size) in found.items()
+            if s not in known or known[s]['mtime'] != mtime or known[s]['size'] != size]
+    removed = [s for s in known if s not in found]
+    for s in removed:
+        del known[s]
+
+    if changed:
+        n = manifest['next']
+        write_segment(os.path.join(index_dir, 'seg%06d' % n),
+                dict((s, _read(config_dir, s)) for s in changed))
+        manifest['next'] = n + 1
+        for s in changed:
+            known[s] = {'mtime': found[s][0], 'size': found[s][1], 'segment': n}
+    save_manifest(manifest, index_dir)
+
+    if len(live_segments(manifest)) > MAX_SEGMENTS:
+        compact(config_dir, index_dir)
+    else:
+        _prune(manifest, index_dir)
+    return len(changed), len(removed)
+
+# Rebuild the whole index as one segment
+def compact(config_dir=CONFIG_DIR, index_dir=INDEX_DIR):
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = load_manifest(index_dir)
+    found = scan_configs(config_dir)
+    n = manifest['next']
+    write_segment(os.path.join(index_dir, 'seg%06d' % n),
+            dict((s, _read(config_dir, s)) for s in found))
+    manifest = {'next': n + 1, 'switches': dict(
+            (s, {'mtime': mtime, 'size': size, 'segment': n}) for s, (mtime, size) in found.items())}
+    save_manifest(manifest, index_dir)
+    _prune(manifest, index_dir)
+
+# Search the index
+# Parameters:
+#   text<String> = substring to look for, or
+#   pattern<String> = regex to match against each line
+#   index_dir<String> = where the index is
+#
+# Return:
+#   hits<Array[(String, String, String)]> = (switch, section, line), sorted
+def search(text=None, pattern=None, index_dir=INDEX_DIR):
+    manifest = load_manifest(index_dir)
+    current = dict((s, v['segment']) for s, v in manifest['switches'].items())
+    regex = re.compile(pattern.encode(), re.MULTILINE) if pattern is not None else None
+    needle = text.encode() if text is not None else None
+    hits = []
+    for n in live_segments(manifest):
+        seg = Segment(os.path.join(index_dir, 'seg%06d' % n))
+        try:
+            for i in seg.find(needle, regex):
+                line = seg.line(i)
+                for switch, section in seg.postings(i):
+                    # An older copy of a switch that's been re-indexed since
+                    if current.get(switch) != n:
+                        continue
+                    hits.append((switch, seg.section(section), line))
+        finally:
+            seg.close()
+    hits.sort()
+    return hits
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('update', 'query', 'regex', 'compact') or \
+            (sys.argv[1] in ('query', 'regex') and len(sys.argv) < 3):
+        print("!ERROR: usage: configindex.py update [config dir]")
+        print("               configindex.py query [-l] <text>")
+        print("               configindex.py regex [-l] <pattern>")
+        print("               configindex.py compact [config dir]")
+        sys.exit(1)
+
+    if sys.argv[1] in ('update', 'compact'):
+        config_dir = sys.argv[2] if len(sys.argv) > 2 else CONFIG_DIR
+        if not os.path.isdir(config_dir):
+            print("!ERROR: No configs in " + config_dir + ", collect them with scpconfig.py first")
+            sys.exit(1)
+        start = time.time()
+        if sys.argv[1] == 'compact':
+            compact(config_dir)
+            print("*Index rebuilt in %.1f s" % (time.time() - start))
+        else:
+            changed, removed = update(config_dir)
+            print("*%d configs indexed, %d removed in %.1f s" % (changed, removed, time.time() - start))
+        return
+
+    args = sys.argv[2:]
+    only_switches = '-l' in args
+    args = [a for a in args if a != '-l']
+    if not os.path.exists(os.path.join(INDEX_DIR, MANIFEST)):
+        print("!ERROR: No index yet, run configindex.py update first")
+        sys.exit(1)
+
+    start = time.time()
+    if sys.argv[1] == 'query':
+        hits = search(text=' '.join(args))
+    else:
+        hits = search(pattern=' '.join(args))
+    took = time.time() - start
+
+    switches = sorted(set(h[0] for h in hits))
+    if only_switches:
+        for s in switches:
+            print(s)
+    else:
+        for switch, section, line in hits:
+            print(switch + ": " + (section + " > " if section else "") + line)
+    print("-%d matching lines on %d switches in %.1f ms" % (len(hits), len(switches), took * 1000))
+
+# Execute the program
+if __name__ == "__main__":
+    main()
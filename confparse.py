@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+# Title: confparse.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Answer the same questions the scripts ask the switch ('sh run | sec template',
+#          'sh running-config | i VOIP', 'sh run int X | inc ...') from a running config
+#          that's already on disk, so a config only has to be pulled off the switch once.
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import re
+
+# Same filter fourpete.py and twoplay.py hand to 'sh run int X | inc'
+PORT_FILTER = r'(max|desc|access|max|speed|duplex)|interface'
+
+# Long interface names for the short ones 'sh vl br' prints
+PORT_NAMES = (
+        ('Twe', 'TwentyFiveGigE'),
+        ('Tw', 'TwoGigabitEthernet'),
+        ('Te', 'TenGigabitEthernet'),
+        ('Gi', 'GigabitEthernet'),
+        ('Fa', 'FastEthernet'),
+        ('Fo', 'FortyGigabitEthernet'),
+        ('Po', 'Port-channel'),
+        ('Vl', 'Vlan'))
+
+# Turn a short port name into the name the running config uses
+# Parameters:
+#   port<String> = e.g. 'Gi1/0/1'
+#
+# Return:
+#   name<String> = e.g. 'GigabitEthernet1/0/1'
+def long_port_name(port):
+    for short, full in PORT_NAMES:
+        if port.startswith(full):
+            return port
+        if port.startswith(short) and port[len(short):len(short) + 1].isdigit():
+            return full + port[len(short):]
+    return port
+
+# Turn a long port name into the short one 'sh vl br' uses
+# Parameters:
+#   name<String> = e.g. 'GigabitEthernet1/0/1'
+#
+# Return:
+#   port<String> = e.g. 'Gi1/0/1'
+def short_port_name(name):
+    for short, full in PORT_NAMES:
+        if name.startswith(full):
+            return short + name[len(full):]
+    return name
+
+# Split a config into top level blocks, a line with no indent plus the indented
+# lines under it
+# Parameters:
+#   config<String> = running config text
+#
+# Return:
+#   blocks<Array[Array[String]]> = each block's lines, header first
+def blocks(config):
+    result = []
+    for line in config.replace('\r', '').split('\n'):
+        if not line.strip() or line.startswith('!'):
+            continue
+        if line[0] in ' \t' and result:
+            result[-1].append(line)
+        else:
+            result.append([line])
+    return result
+
+# Same as 'sh run | sec <pattern>': every block with a line that matches
+# Parameters:
+#   config<String> = running config text
+#   pattern<String> = regex, like the switch takes
+#
+# Return:
+#   output<String> = matching blocks
+def section(config, pattern):
+    regex = re.compile(pattern)
+    out = []
+    for block in blocks(config):
+        if any(regex.search(line) for line in block):
+            out.extend(block)
+    return '\n'.join(out)
+
+# Same as 'sh running-config | i <pattern>': every line that matches
+# Parameters:
+#   config<String> = running config text
+#   pattern<String> = regex, like the switch takes
+#
+# Return:
+#   output<String> = matching lines
+def include(config, pattern):
+    regex = re.compile(pattern)
+    return '\n'.join(l for l in config.replace('\r', '').split('\n') if regex.search(l))
+
+# Every interface block in a config
+# Parameters:
+#   config<String> = running config text
+#
+# Return:
+#   interfaces<Dict{String: Array[String]}> = long interface name -> block lines
+def interfaces(config):
+    result = {}
+    for block in blocks(config):
+        if block[0].startswith('interface '):
+            result[block[0].split(None, 1)[1].strip()] = block
+    return result
+
+# Same as 'sh run int <port> | inc <filter>' on a local config
+# Parameters:
+#   config<String> = running config text, or the dict from interfaces() to save re-parsing
+#   port<String> = port name, short or long
+#   pattern<String> = include filter, PORT_FILTER by default
+#
+# Return:
+#   output<String> = matching lines of that interface, empty if there's no such interface
+def interface_config(config, port, pattern=PORT_FILTER):
+    ifaces = interfaces(config) if isinstance(config, str) else config
+    block = ifaces.get(long_port_name(port), [])
+    regex = re.compile(pattern)
+    return '\n'.join(l for l in block if regex.search(l))
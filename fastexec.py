@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+# Title: fastexec.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Cheap read-only path for show commands. Runs the command on a plain SSH exec
+#          channel (like play.py's execute()) instead of netmiko's interactive shell, so
+#          there's no prompt detection or screen scraping. Clients are kept open and
+#          reused per switch. Run it directly to compare against netmiko:
+#               ./fastexec.py <host> "<command>" [runs] [port]
+#
+# Dependencies:
+#          Paramiko python3 module (comes with netmiko)
+#          Netmiko python3 module for the benchmark and send_command()
+
+# Import statements
+import re
+import sys
+import time
+import getpass
+import threading
+
+# Commands that can't change anything on the switch
+READ_ONLY = ('sh ', 'show ', 'dir ', 'more ')
+# Output modifiers that write the output somewhere ('| redirect flash:x', '| tee', '| append')
+WRITE_MODIFIERS = ('append', 'redirect', 'tee')
+# An output modifier: a '|' with a space after it, then the modifier. A '|' with no
+# space after it is regex alternation inside an include/exclude pattern ('i ^a|b')
+MODIFIER_RE = re.compile(r'\|\s+(\S+)')
+
+# What a pager leaves behind if one sneaks in: '--More--' and the backspaces that erase it
+MORE_RE = re.compile(rb' ?--More-- ?(?:\x08+ *\x08+)?')
+
+# Is this command safe for the read-only path?
+# A show command piped into a modifier that writes a file isn't. IOS takes any
+# abbreviation of a modifier ('| red', '| t'), so those count too.
+# Parameters:
+#   cmd<String> = command
+#
+# Return:
+#   True if the command only reads from the switch
+def is_read_only(cmd):
+    cmd = cmd.strip().lower()
+    if not (cmd + ' ').startswith(READ_ONLY):
+        return False
+    for word in MODIFIER_RE.findall(cmd):
+        if any(m.startswith(word) for m in WRITE_MODIFIERS):
+            return False
+    return True
+
+# Run a command on its own exec channel and read the raw bytes
+# The channel has no pty, so IOS never starts paging and 'terminal length 0' isn't needed
+# Parameters:
+#   transport<paramiko.Transport> = authenticated SSH transport
+#   cmd<String> = command to run
+#   timeout<Float> = seconds to wait for the channel and each read
+#
+# Return:
+#   data<Bytes> = everything the command printed
+def exec_bytes(transport, cmd, timeout=30):
+    chan = transport.open_session(timeout=timeout)
+    try:
+        chan.settimeout(timeout)
+        chan.exec_command(cmd)
+        data = []
+        while True:
+            chunk = chan.recv(65536)
+            if not chunk:
+                break
+            data.append(chunk)
+        return b''.join(data)
+    finally:
+        chan.close()
+
+# Turn raw command output into text
+# Cleanup is done on the bytes before one decode, rather than per chunk
+# Parameters:
+#   data<Bytes> = raw output
+#
+# Return:
+#   output<String> = output with pager junk and carriage returns removed
+def decode(data):
+    data = MORE_RE.sub(b'', data).replace(b'\r\n', b'\n').replace(b'\r', b'')
+    return data.decode('utf-8', errors='replace').strip()
+
+# Pool of open SSH clients for running read-only commands without netmiko
+# Parameters:
+#   user<String> = username
+#   password<String> = password
+#   timeout<Float> = seconds for connect, auth and each read
+#   port<Int> = SSH port
+class ExecTransport:
+    def __init__(self, user, password, timeout=30, port=22):
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.port = port
+        self.clients = {}
+        self._lock = threading.Lock()
+
+    # Get an open client for a switch, connecting only if we don't have a live one
+    # The lock isn't held while connecting so many switches can log in at once
+    def _client(self, host):
+        with self._lock:
+            client = self.clients.get(host)
+        if client is not None:
+            transport = client.get_transport()
+            if transport is not None and transport.is_active():
+                return client
+            client.close()
+
+        import paramiko
+        client = paramiko.SSHClient()
+        # Set AutoAddPolicy so that we are not prompted to add new hosts to know_hosts file
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # look_for_keys=False keeps us from trying to use keypair, we want plaintext passwd
+        client.connect(host, self.port, self.user, self.password,
+                look_for_keys=False, allow_agent=False,
+                timeout=self.timeout, banner_timeout=self.timeout,
+                auth_timeout=self.timeout)
+        with self._lock:
+            self.clients[host] = client
+        return client
+
+    # Authenticated transport for a switch, for callers that open their own channels
+    def transport(self, host):
+        return self._client(host).get_transport()
+
+    # Run a read-only command on a switch
+    # Parameters:
+    #   host<String> = switch hostname
+    #   cmd<String> = show command
+    #
+    # Return:
+    #   output<String> = command output
+    def run(self, host, cmd):
+        if not is_read_only(cmd):
+            raise ValueError("Not a read-only command: " + cmd)
+        transport = self.transport(host)
+        return decode(exec_bytes(transport, cmd, self.timeout))
+
+    # Close one switch's client, or all of them
+    def close(self, host=None):
+        with self._lock:
+            hosts = [host] if host else list(self.clients)
+            for h in hosts:
+                client = self.clients.pop(h, None)
+                if client is not None:
+                    client.close()
+
+# Send a command over netmiko, or over the fast path if asked and it's read-only
+# The fast path reuses netmiko's already authenticated transport
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   cmd<String> = command to run
+#   fast<Boolean> = use an exec channel instead of the interactive shell
+#
+# Return:
+#   output<String> = command output
+def send_command(ssh, cmd, fast=False, **kwargs):
+    if fast and is_read_only(cmd):
+        conn = getattr(ssh, 'remote_conn', None)
+        if conn is not None and hasattr(conn, 'get_transport'):
+            return decode(exec_bytes(conn.get_transport(), cmd))
+    return ssh.send_command(cmd, **kwargs)
+
+# Time a function a number of times
+# Return:
+#   times<Array[Float]> = seconds for each run, sorted
+def time_runs(fn, runs):
+    times = []
+    for _ in range(runs):
+        t = time.monotonic()
+        fn()
+        times.append(time.monotonic() - t)
+    return sorted(times)
+
+# Compare netmiko send_command with the fast path on one switch (or simulator)
+def main():
+    if len(sys.argv) < 3:
+        print("!ERROR: usage: fastexec.py <host> \"<command>\" [runs] [port]")
+        sys.exit(1)
+    host = sys.argv[1]
+    cmd = sys.argv[2]
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    port = int(sys.argv[4]) if len(sys.argv) > 4 else 22
+
+    try:
+        user = input("Enter username: ")
+        password = getpass.getpass("Enter password: ")
+    except KeyboardInterrupt:
+        print()
+        print("!ERROR: Caught KeyboardInterrupt, exiting")
+        sys.exit(1)
+
+    import netmiko
+    ssh = netmiko.ConnectHandler(device_type='cisco_ios', ip=host, port=port,
+            username=user, password=password)
+    ssh.enable()
+    fast = ExecTransport(user, password, port=port)
+    # Connect once up front so both sides are timed on an open session
+    fast.run(host, cmd)
+
+    results = [
+            ('netmiko send_command', time_runs(lambda: ssh.send_command(cmd), runs)),
+            ('exec channel (pooled)', time_runs(lambda: fast.run(host, cmd), runs)),
+            ('exec channel (netmiko transport)', time_runs(lambda: send_command(ssh, cmd, fast=True), runs))]
+
+    ssh.disconnect()
+    fast.close()
+
+    print()
+    print("%d runs of '%s' on %s:%d" % (runs, cmd, host, port))
+    base = results[0][1][runs // 2]
+    for name, times in results:
+        median = times[runs // 2]
+        print("  %-34s median %7.1f ms  min %7.1f ms  %.1fx" %
+                (name, median * 1000, times[0] * 1000, base / max(median, 1e-9)))
+
+# Execute the program
+if __name__ == "__main__":
+    main()
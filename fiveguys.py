@@ -18,8 +18,17 @@
 import os
 import sys
 import socket
-import netmiko
 import getpass
+import fleet
+import progress
+import scheduler
+import probe
+import switchlist
+
+# Most switches in flight per building / AAA server group
+GROUP_CAP = 8
+# Most logins per second per building / AAA server group
+GROUP_LOGIN_RATE = 2.0
 
 # Get keyboard input for username and password
 # Return:
@@ -74,11 +83,80 @@ def get_workstation_vlans(ssh):
 
     return vlans
 
+# Build the job fleet.py runs on each switch: log in and grab its workstation VLANs
+# Parameters:
+#   user<String> = username
+#   password<String> = password
+#
+# Return:
+#   job<Function> = job(switch, timed) -> Array[String] of VLAN IDs
+def make_job(user, password):
+    # netmiko takes a while to load, wait until we're about to log in
+    import netmiko
+
+    def job(s, timed):
+        if not check_host(s):
+            raise LookupError("Check hostname")
+        # Build the ssh object
+        # Here is where we can specify anything specific about the switch
+        #   device type, secrete phrase, etc
+        with timed('connect'):
+            ssh = netmiko.ConnectHandler(
+                    device_type = 'cisco_ios',
+                    ip = s,
+                    username = user,
+                    password = password)
+
+            # Open ssh connection
+            ssh.enable()
+
+        try:
+            # Get the VLAN IDs for workstaion VLANs and store in arrays
+            with timed('command'):
+                return get_workstation_vlans(ssh)
+        finally:
+            # Close ssh connection to switch
+            ssh.disconnect()
+
+    return job
+
+# Write workstation-vlans.txt from a fleet run
+# Parameters:
+#   results<Dict{String: (String, Object)}> = from fleet.run_fleet() with make_job()
+def write_vlans(results):
+    f = open('workstation-vlans.txt', 'w')
+
+    # Go over each switch that was listed in the file
+    for s, (status, vlans) in results.items():
+        if status != 'ok':
+            print("!ERROR: " + s + ": " + str(vlans))
+            continue
+
+        # Just in case there are no workstation vlans on the switch, skip it
+        if len(vlans) == 0:
+            print("!No workstation VLANs, skipping switch " + s)
+            continue
+
+        # Write switch name to file
+        f.write(s + " ")
+        # Write workstation VLAN IDs to file
+        f.write(','.join(vlans))
+        f.write('\n')
+
+    f.close()
+
 # Main program logic
 #
 def main():
     # Make sure user entered list of switches as command line arg
     # Pre-condition: File is formatted correctly with one switch hostname per line
+    # Extra columns after the hostname (comma separated) can be used for grouping,
+    # and so can the [group] a switch is listed under
+    # Optional grouping rules follow the file, see scheduler.make_grouper(), e.g.
+    #   fiveguys.py switches.txt bldg=column:1 aaa=column:2
+    #   fiveguys.py grouped-switches.txt bldg=group
+    # -q anywhere for just the summary instead of the live status line
+    tracker = progress.Progress.from_argv()
     if len(sys.argv) == 1:
         print("!ERROR: You need to specify the file containing switches")
         sys.exit(1)
@@ -88,62 +166,33 @@ def main():
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
+        # Each switch once, however many times it's in the file
+        jobs = switchlist.load(sys.argv[1])
+        switches = [j.host for j in jobs]
+        rows = [j.row for j in jobs]
+
+        # Drop switches that are down before we try logging in to them
+        switches = probe.split_reachable(switches)
+        live = set(switches)
+        rows = [r for r in rows if r[0] in live]
+
+        # Only build a scheduler if the user asked for grouping
+        sched = None
+        if len(sys.argv) > 2:
+            sched = scheduler.GroupScheduler(rows, scheduler.make_grouper(sys.argv[2:]),
+                    cap=GROUP_CAP, rate=GROUP_LOGIN_RATE, burst=GROUP_CAP,
+                    listed=dict((j.host, j.group) for j in jobs))
         # Get username and password for switches from keyboard
         user, password = user_input()
+        # Log in to one switch and grab its workstation VLANs
+        # This runs on many switches at once, fleet.py decides how many
+        job = make_job(user, password)
         print()
 
-        f = open('workstation-vlans.txt', 'w')
-
-        # Go over each switch that was listed in the file
-        for s in switches:
-            # Let us know which one we're working with
-            print("*Current switch " + s)
-            if (check_host(s)):
-                # Build the ssh object
-                # Here is where we can specify anything specific about the switch
-                #   device type, secrete phrase, etc
-                ssh = netmiko.ConnectHandler(
-                        device_type = 'cisco_ios',
-                        ip = s,
-                        username = user,
-                        password = password)
-
-                # Open ssh connection
-                ssh.enable()
-
-                # Get the VLAN IDs for workstaion VLANs and store in arrays
-                vlans = get_workstation_vlans(ssh)
-
-                # Just in case there are no workstation vlans on the switch, skip it
-                if len(vlans) == 0:
-                    print("!No workstation VLANs, skipping switch " + s)
-                    continue
-
-                # Write switch name to file
-                f.write(s + " ")
-                # Write workstation VLAN IDs to file
-                f.write(','.join(vlans))
-
-                # We're done with this switch
-
-                # Close ssh connection to switch
-                ssh.disconnect()
-
-                f.write('\n')
-
-            # Hostname didn't resolve
-            else:
-                print("!ERROR: Check hostname")
-                sys.exit(1)
+        results = fleet.run_fleet(switches, job, progress=tracker, scheduler=sched)
+        write_vlans(results)
+
         print()
-        f.close()
         # No switches are left in the list, we're done
         print("Done with all switches.")
         print("Exiting")
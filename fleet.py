@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+
+# Title: fleet.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Run a job against a whole list of switches at once, with the number of
+#          switches in flight tuned on the fly (AIMD). The limit creeps up while connect
+#          and command latency stay steady, and gets cut in half when logins start
+#          failing or timing out (TACACS or the jump host is telling us to back off).
+#
+#          run_processes() does the same across several processes, each one running
+#          its own run_fleet() threads, for when SSH crypto and config parsing keep
+#          one core pegged. The parent process gets every result as it comes in and
+#          is the only one writing anything.
+#
+# Dependencies:
+#          None outside the standard library. Jobs usually use netmiko.
+
+# Import statements
+import os
+import time
+import queue
+import pickle
+import threading
+import contextlib
+import multiprocessing
+
+# Exception class names that mean the switch (or TACACS behind it) is overloaded.
+# Matched by name so this module never has to import netmiko or paramiko itself.
+AUTH_ERRORS = (
+        'AuthenticationException',
+        'NetMikoAuthenticationException',
+        'NetmikoAuthenticationException')
+TIMEOUT_ERRORS = (
+        'NetMikoTimeoutException',
+        'NetmikoTimeoutException',
+        'ReadTimeout',
+        'timeout',
+        'TimeoutError')
+
+# Figure out what kind of failure an exception is
+# Parameters:
+#   e<Exception> = exception raised by a job
+#
+# Return:
+#   'auth', 'timeout' or 'error'
+def classify_error(e):
+    for cls in type(e).__mro__:
+        if cls.__name__ in AUTH_ERRORS:
+            return 'auth'
+        if cls.__name__ in TIMEOUT_ERRORS:
+            return 'timeout'
+    return 'error'
+
+# Additive-increase / multiplicative-decrease limit on switches in flight
+#
+# Every phase that gets timed ('connect', 'command', ...) keeps a fast moving average
+# and a baseline (the best average we have seen, allowed to drift up slowly). A job
+# that finishes with every phase under tolerance * baseline grows the limit, one
+# switch per full window of completions (or one per completion during slow start).
+# An auth failure or timeout halves the limit, at most once per window of jobs so a
+# burst of failures that were already in flight only counts once.
+class AIMDLimiter:
+    def __init__(self, start=4, minimum=1, maximum=64, decrease=0.5, tolerance=1.5):
+        self.limit = float(start)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.slow_start = True
+        self.in_flight = 0
+        self._ticket = 0
+        self._cut_ticket = 0
+        self._avg = {}
+        self._baseline = {}
+        self._congested = set()
+        self._cond = threading.Condition()
+
+    # Current limit as a whole number of switches
+    def current(self):
+        return max(self.minimum, int(self.limit))
+
+    # Block until there is room for one more switch
+    # Return:
+    #   ticket<Int> = number handed back to release() when the job is done
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.current():
+                self._cond.wait()
+            self.in_flight += 1
+            self._ticket += 1
+            return self._ticket
+
+    # Record how long one phase of a job took
+    # Parameters:
+    #   ticket<Int> = ticket from acquire()
+    #   phase<String> = name of the phase, e.g. 'connect' or 'command'
+    #   seconds<Float> = how long it took
+    def observe(self, ticket, phase, seconds):
+        with self._cond:
+            avg = self._avg.get(phase)
+            avg = seconds if avg is None else 0.7 * avg + 0.3 * seconds
+            self._avg[phase] = avg
+            base = self._baseline.get(phase)
+            base = avg if base is None else min(base * 1.01, avg)
+            self._baseline[phase] = base
+            if seconds > self.tolerance * base:
+                self._congested.add(ticket)
+
+    # Context manager that times a phase of a job
+    # Parameters:
+    #   ticket<Int> = ticket from acquire()
+    #   phase<String> = name of the phase
+    @contextlib.contextmanager
+    def timed(self, ticket, phase):
+        start = time.monotonic()
+        yield
+        self.observe(ticket, phase, time.monotonic() - start)
+
+    # Give a slot back and adjust the limit
+    # Parameters:
+    #   ticket<Int> = ticket from acquire()
+    #   error<String> = None on success, otherwise a classify_error() result
+    #                   ('cancel' hands the slot back without touching the limit)
+    def release(self, ticket, error=None):
+        with self._cond:
+            self.in_flight -= 1
+            congested = ticket in self._congested
+            self._congested.discard(ticket)
+            if error in ('auth', 'timeout'):
+                # Only cut for jobs that started after the last cut
+                if ticket > self._cut_ticket:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.slow_start = False
+                    self._cut_ticket = self._ticket
+            elif error is None and not congested:
+                if self.slow_start:
+                    self.limit += 1
+                else:
+                    self.limit += 1.0 / self.limit
+                self.limit = min(self.maximum, self.limit)
+            elif congested:
+                # Latency is climbing, stop growing but don't back off yet
+                self.slow_start = False
+            self._cond.notify_all()
+
+# Run a job on every switch in a list, concurrently
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   job<Function> = job(switch, timed) -> result. timed(phase) is a context manager
+#                   the job wraps around its connect and commands so the limiter can
+#                   watch latency
+#   limiter<AIMDLimiter> = concurrency controller, a fresh one if not given
+#   progress<Function> = called with one line of text per finished switch, or a
+#                        progress.Progress (anything with begin(), started(),
+#                        finished() and end()) for one live status line instead
+#   scheduler<GroupScheduler> = picks which switch goes next so per-building and
+#                               per-AAA caps hold (scheduler.py), list order if not given
+#
+# Return:
+#   results<Dict{String: (String, Object)}> = switch -> (status, result or exception)
+#       in the same order as the switch list. Status is 'ok', 'auth', 'timeout' or 'error'
+def run_fleet(switches, job, limiter=None, progress=print, scheduler=None):
+    if limiter is None:
+        limiter = AIMDLimiter()
+
+    results = dict.fromkeys(switches)
+    counts = {'done': 0, 'failed': 0}
+    lock = threading.Lock()
+    threads = []
+
+    # A progress.Progress gets events, a plain function gets a line per switch
+    tracker = progress if hasattr(progress, 'finished') else None
+    if tracker:
+        progress = None
+        tracker.begin(len(results), limiter)
+
+    def worker(s, ticket):
+        if tracker:
+            tracker.started(s)
+        status = 'ok'
+        try:
+            value = job(s, lambda phase: limiter.timed(ticket, phase))
+        except Exception as e:
+            status = classify_error(e)
+            value = e
+        if scheduler:
+            scheduler.done(s)
+        limiter.release(ticket, None if status == 'ok' else status)
+        if tracker:
+            tracker.finished(s, status, value)
+        with lock:
+            results[s] = (status, value)
+            counts['done'] += 1
+            if status != 'ok':
+                counts['failed'] += 1
+            if progress:
+                line = "[%d/%d] limit=%d in-flight=%d failed=%d %s: %s" % (
+                        counts['done'], len(results), limiter.current(),
+                        limiter.in_flight, counts['failed'], s, status)
+                if status != 'ok':
+                    line += " (" + str(value) + ")"
+                progress(line)
+
+    if scheduler:
+        order = iter(scheduler.take, None)
+    else:
+        order = iter(list(results))
+
+    try:
+        # Get a global slot first, then ask for a switch, so a switch never holds its
+        # group's slot while it waits for a global one
+        while True:
+            ticket = limiter.acquire()
+            s = next(order, None)
+            if s is None:
+                limiter.release(ticket, 'cancel')
+                break
+            t = threading.Thread(target=worker, args=(s, ticket), daemon=True)
+            t.start()
+            threads.append(t)
+
+        for t in threads:
+            t.join()
+    finally:
+        if tracker:
+            tracker.end()
+
+    return results
+
+# run_fleet() scheduler that takes switches from a queue shared by every process
+# None in the queue means this process is done
+class _TaskFeed:
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def take(self):
+        return self.tasks.get()
+
+    def done(self, switch):
+        pass
+
+# run_fleet() progress that passes each event back to the parent process
+class _Forward:
+    def __init__(self, out):
+        self.out = out
+        self.pid = os.getpid()
+
+    def begin(self, total, limiter=None):
+        pass
+
+    def started(self, switch):
+        self.out.put(('started', self.pid, switch, None, None))
+
+    def finished(self, switch, status, value=None):
+        # Exceptions don't always survive pickling, their message does
+        if status != 'ok':
+            value = str(value)
+        try:
+            data = pickle.dumps(value)
+        except Exception as e:
+            status, data = 'error', pickle.dumps("Result can't be sent back: " + str(e))
+        self.out.put(('finished', self.pid, switch, status, data))
+
+    def end(self):
+        pass
+
+# What each process runs
+def _process_main(make_job, args, tasks, out, maximum):
+    job = make_job(*args)
+    run_fleet([], job, AIMDLimiter(maximum=maximum), progress=_Forward(out), scheduler=_TaskFeed(tasks))
+    out.put(('exit', os.getpid(), None, None, None))
+
+# Run a job on every switch in a list across several processes, with run_fleet()
+# threads in each one. Switches go out from one shared queue, so a process that gets
+# quick switches just takes more
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   make_job<Function> = make_job(*args) -> job(switch, timed), called once in each
+#                        process. Has to be a module level function so it can be
+#                        sent to the processes, and the job's results have to pickle
+#   args<Tuple> = arguments for make_job
+#   processes<Int> = how many processes, one per core if not given
+#   progress<Function> = same as run_fleet(), only ever called in this process
+#   maximum<Int> = most switches in flight over all the processes
+#   on_result<Function> = on_result(switch, status, value) as each switch finishes,
+#                         in this process, e.g. to write it out right away
+#
+# Return:
+#   results<Dict{String: (String, Object)}> = same as run_fleet(), except errors come
+#       back as their message instead of the exception
+def run_processes(switches, make_job, args=(), processes=None, progress=print, maximum=64, on_result=None):
+    processes = max(1, min(processes or os.cpu_count() or 1, len(switches) or 1))
+    tasks = multiprocessing.Queue()
+    out = multiprocessing.Queue()
+    for s in switches:
+        tasks.put(s)
+    for _ in range(processes):
+        tasks.put(None)
+
+    procs = [multiprocessing.Process(target=_process_main, daemon=True,
+            args=(make_job, args, tasks, out, max(1, maximum // processes))) for _ in range(processes)]
+    for p in procs:
+        p.start()
+
+    results = dict.fromkeys(switches)
+    counts = {'done': 0, 'failed': 0}
+    in_flight = dict((p.pid, set()) for p in procs)
+    exited = set()
+    tracker = progress if hasattr(progress, 'finished') else None
+    if tracker:
+        tracker.begin(len(results))
+
+    def record(s, status, value):
+        results[s] = (status, value)
+        counts['done'] += 1
+        if status != 'ok':
+            counts['failed'] += 1
+        if on_result:
+            on_result(s, status, value)
+        if tracker:
+            tracker.finished(s, status, value)
+        elif progress:
+            line = "[%d/%d] processes=%d failed=%d %s: %s" % (counts['done'], len(results),
+                    len(procs) - len(exited), counts['failed'], s, status)
+            if status != 'ok':
+                line += " (" + str(value) + ")"
+            progress(line)
+
+    try:
+        while len(exited) < len(procs):
+            try:
+                kind, pid, s, status, data = out.get(timeout=1.0)
+            except queue.Empty:
+                # Nothing came in for a second, see if a process died on us
+                for p in procs:
+                    if p.pid not in exited and not p.is_alive():
+                        exited.add(p.pid)
+                        for s in in_flight.pop(p.pid, ()):
+                            record(s, 'error', "Worker process died (exit code %s)" % p.exitcode)
+                continue
+            if kind == 'started':
+                in_flight[pid].add(s)
+                if tracker:
+                    tracker.started(s)
+            elif kind == 'finished':
+                in_flight[pid].discard(s)
+                record(s, status, pickle.loads(data))
+            else:
+                exited.add(pid)
+        for s, result in results.items():
+            if result is None:
+                record(s, 'error', "No result, the worker process that took it died")
+    finally:
+        for p in procs:
+            p.join(timeout=5)
+        if tracker:
+            tracker.end()
+
+    return results
@@ -17,11 +17,17 @@
 #               Install using the following: sudo -H pip3 install netmiko
 
 # Import statements
-import os
 import sys
 import socket
-import netmiko
 import getpass
+import switchlist
+import multichan
+import plan
+import verify
+import runarchive
+
+# How many exec channels to use for the per-port queries (1 is the old serial way)
+PORT_CHANNELS = 4
 
 # Get keyboard input for username and password
 # Return:
@@ -86,16 +92,21 @@ def get_workstation_vlans(ssh):
 # Parameters:
 #   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
 #   ports<Array[String]> = List of access ports
+#   channels<Int> = run the queries over this many exec channels at once (multichan.py),
+#                   1 sends them as one batch on the interactive shell
 #
 # Return:
 #   result<Array[String]> = Running config for list of access ports
-def get_running_config(ssh, ports):
+def get_running_config(ssh, ports, channels=1):
     result = []
     result.append(ssh.find_prompt() + "\n")
 
-    for p in ports:
-        # COMMAND THAT WILL RUN ON SWITCH
-        result.append(ssh.send_command("sh run int " + p + " | inc (max|desc|access|max|speed|duplex)|interface", delay_factor=2))
+    if channels > 1:
+        return result + multichan.get_running_config(ssh, ports, channels)
+
+    # COMMAND THAT WILL RUN ON SWITCH (multichan.PORT_CMD for each port), all of them
+    # written at once and the output split back up by prompt
+    result += multichan.send_port_batch(ssh, ports)
 
     # Returns the entire running config of access ports as one string
     return result
@@ -107,48 +118,34 @@ def get_running_config(ssh, ports):
 #   switch<String> = switch hostname so we can tell if it's 3750 or 3850
 #
 # Return:
-#   result<Array[String]> = config commands that were applied to the switch
+#   sent<Array[Array[String]]> = command block of each port that was actually sent
+#   result<Array[String]> = switch output from sending them
 def config_access_ports(ssh, config, switch):
+    sent = []
     result = []
 
     # For each access port:
     for p in config:
-        # COMMANDS THAT WILL RUN ON SWITCH
-        commands = [
-                'no logging event link-status',
-                'power inline auto',
-                'source template BX_VOIP_VLAN_361_TEMPLATE']
-
-        # If we're working with a c3750 switch, we need to add two additional commands
-        if switch.find("3750") is not -1:
-            # COMMANDS THAT WILL RUN ON SWITCH
-            commands.append("srr-queue bandwidth share 1 30 35 5")
-            commands.append("priority-queue out")
-    
+        # COMMANDS THAT WILL RUN ON SWITCH (worked out in plan.py so 'plan.py plan'
+        # comes up with exactly the same thing offline)
+        commands = plan.port_commands(p, switch)
+
         # Sometimes the switch name prompt gets caught in the runnig config
         # We want to make sure we're working with only interfaces
-        if p.find("interface") is not -1:
-            iface = p.split()
-            # COMMANDS THAT WILL RUN ON SWITCH
-            # should be 'interface GigabitEthernetX/X/XX'
-            commands.insert(0,iface[0] + " " + iface[1])
-            # If the port already has a port-security maximum set
-            if p.find("maximum") is not -1:
-                # Send config commands to switch
-                # result.append(ssh.send_config_set(commands))
-                print("-Command would be sent here")
-            # If the port has no port-sexurity maximum set, set it to 2
-            else:
-                # COMMANDS THAT WILL RUN ON SWITCH
-                commands.append("switchport port-security maximum 2")
-                # Send config commands to switch
-                # result.append(ssh.send_config_set(commands))
-                print("-Command would be sent here")
+        if commands is not None:
+            # Skip what the port already has
+            commands = plan.drop_present(commands, p)
+        if commands:
+            # Send config commands to switch
+            # Uncomment both lines together, sent is what gets verified
+            # result.append(ssh.send_config_set(commands))
+            # sent.append(commands)
+            print("-Command would be sent here")
         # DEBUG
         print(commands)
 
-    # Return full list of commands that were run on the switch
-    return result
+    # Return the commands that were run on the switch and what it said back
+    return sent, result
 
 # Main program logic
 #
@@ -164,15 +161,12 @@ def main():
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
+        # Each switch once, however many times it's in the file
+        switches = switchlist.hosts(sys.argv[1])
         # Get username and password for switches from keyboard
         user, password = user_input()
+        # netmiko takes a while to load, wait until we're about to log in
+        import netmiko
         print()
 
         # Go over each switch that was listed in the file
@@ -194,10 +188,6 @@ def main():
                 ssh.enable()
                 print("*Done")
 
-                # Make a dir for each switch as each switch will generate a few output files
-                if not os.path.exists(s):
-                    os.mkdir(s)
-
                 # Get the VLAN IDs and access ports for workstaion VLANs and store in arrays
                 print("*Getting workstation VLANs and access ports...")
                 vlans, ports = get_workstation_vlans(ssh)
@@ -211,56 +201,43 @@ def main():
                 # Get the running config for access ports in workstation VLANs and store in array
                 # This is before any changes have been made to the switch
                 print("*Building config...")
-                config = get_running_config(ssh, ports)
+                config = get_running_config(ssh, ports, PORT_CHANNELS)
                 print("*Done")
 
-                # Create new file and write workstation VLAN IDs to it
-                print("*Writing workstation VLAN IDs to file " + s + "-vlans.txt ...")
-                f = open(s + "/" + s + '-vlans.txt', 'w')
-                f.write('\n'.join(vlans))
-                f.close()
-                print("*Done")
-
-                # Create new file and write workstation access ports to it
-                print("*Writing workstation access ports to file " + s + "-ports.txt ...")
-                f = open(s + "/" + s + '-ports.txt', 'w')
-                f.write('\n'.join(ports))
-                f.close()
-                print("*Done")
-
-                # Create a new file and write the running config of access ports to it
-                # No changes have been made to the switch yet
-                print("*Writing config before changes to file " + s + "-before.txt ...")
-                f = open(s + "/" + s + '-before.txt', 'w')
-                f.write('\n\n'.join(config))
-                f.close()
+                # Save workstation VLAN IDs, access ports and their running config
+                # to the run archive (runarchive.py), no changes have been made yet
+                print("*Saving " + s + "-vlans, -ports and -before to " + runarchive.ARCHIVE_FILE + " ...")
+                runarchive.write(s, 'vlans', '\n'.join(vlans))
+                runarchive.write(s, 'ports', '\n'.join(ports))
+                runarchive.write(s, 'before', '\n\n'.join(config))
                 print("*Done")
 
                 # Done with the 'before' information
 
                 # Apply changes to switch
                 print("*Sending new config to switch...")
-                new = config_access_ports(ssh, config, s)
+                sent, new = config_access_ports(ssh, config, s)
                 print("*Done")
 
-                # Write the changes that we made to a file
-                print("*Writing config changes that were made to file " + s + "-config.txt ...")
-                f = open(s + "/" + s + '-config.txt', 'w')
-                f.write('\n'.join(new))
-                f.close()
+                # Save the changes that we made, rollback.py undoes exactly these
+                print("*Saving config changes that were made to " + s + "-config ...")
+                runarchive.write(s, 'config', plan.format_blocks(sent))
+                runarchive.write(s, 'config-output', '\n'.join(new))
                 print("*Done")
 
-                # Get the new running config
-                print("*Building new config...")
-                config_new = get_running_config(ssh, ports)
-                print("*Done")
+                # Check only the lines we sent, one query for the whole switch
+                # Full config is only pulled for ports that failed
+                if sent:
+                    print("*Verifying changes...")
+                    checked, bad_ports = verify.verify_switch(ssh, sent)
+                    print("*Done")
 
-                # Write new config to file
-                print("*Writing new config to file " + s + "-after.txt ...")
-                f = open(s + "/" + s + '-after.txt', 'w')
-                f.write('\n\n'.join(config_new))
-                f.close()
-                print("*Done")
+                    # Write the pass/fail report and failed ports' config to file
+                    print("*Saving verify results to " + s + "-verify and failed ports to " + s + "-after ...")
+                    passed, failed = verify.write_report(s, checked, bad_ports)
+                    print("*Done, %d ports passed, %d failed" % (passed, failed))
+                else:
+                    print("-Nothing was sent, skipping verification")
 
                 # Write config to memory
                 # print("*Writing config to memory...")
@@ -277,7 +254,8 @@ def main():
 
                 # Gives the user a moment to review the output files that were generated, and that everything went okay
                 # Make sure we're ready for the next switch
-                print("!Please review output files before moving on")
+                runarchive.flush()
+                print("!Please review output before moving on: ./runarchive.py show " + s)
                 go = input(">Ready for the next switch? (y/N): ").lower()
                 if go != 'y':
                     print("!ERROR: User canceled")
@@ -18,8 +18,11 @@
 import os
 import sys
 import socket
-import netmiko
 import getpass
+import probe
+import switchlist
+import streamparse
+import compliance
 
 # Get keyboard input for username and password
 # Return:
@@ -58,39 +61,10 @@ def check_host(host):
 def get_template(ssh):
     # COMMAND THAT WILL RUN ON SWITCH
     cmd = "sh run | sec template"
-    search_1 = "switchport block unicast"
-    search_2 = "service-policy input custom_voip_policy"
-    # Send command to switch and get output
-    output = ssh.send_command_expect(cmd)
-    output = output.splitlines()
-    num_lines = len(output)
-    result = ''
-
-    for x in range(num_lines):
-        if "template" and "VOIP" and "source" in output[x]:
-            continue
-        if "template" and "VOIP" in output[x]:
-            if (x+1) < num_lines:
-                good_line_1 = False
-                good_line_2 = False
-                
-                for y in range(x+1, num_lines):
-                    if good_line_1 and good_line_2:
-                        result += output[x].split()[1] + ": yes "
-                        break
-                    if search_1 in output[y]:
-                        good_line_1 = True
-                    if search_2 in output[y]:
-                        good_line_2 = True
-                    if 'template' in output[y]:
-                        result += output[x].split()[1] + ": no "
-                        break
-                #if good_line_1 or good_line_2 == False:
-                    #result += output[x].split()[1] + ": no "
-            else:
-                result += output[x].split()[1] + ": no "
-
-    return result
+    # Parse the output line by line while it's still coming off the switch
+    results = streamparse.parse(streamparse.stream_command(ssh, cmd),
+            compliance.ComplianceCheck(compliance.VOIP_RULES))
+    return compliance.yes_no(results)
 
 # Main program logic
 #
@@ -106,15 +80,14 @@ def main():
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
+        # Each switch once, however many times it's in the file
+        switches = switchlist.hosts(sys.argv[1])
+        # Drop switches that are down before we try logging in to them
+        switches = probe.split_reachable(switches)
         # Get username and password for switches from keyboard
         user, password = user_input()
+        # netmiko takes a while to load, wait until we're about to log in
+        import netmiko
         print()
 
         sw_tmp = open('switch_template_check.txt', 'w')
@@ -18,8 +18,13 @@
 import os
 import sys
 import socket
-import netmiko
 import getpass
+import probe
+import switchlist
+import presence
+
+# Which command each platform accepted for the VOIP check, kept between runs
+PRESENCE_CACHE = 'presence-cache.json'
 
 # Get keyboard input for username and password
 # Return:
@@ -49,6 +54,9 @@ def check_host(host):
     except socket.error:
         return 0
 
+# COMMAND THAT WILL RUN ON SWITCH
+VLAN_CMD = "sh vl br | i (W-I|WKSTN|WKST)"
+
 # Connect to an edge switch and get VLAN IDs for workstation VLANs
 # Parameters:
 #   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
@@ -56,12 +64,18 @@ def check_host(host):
 # Return:
 #   vlans<Array[String]> = VLAN IDs of workstation VLANs
 def get_workstation_vlans(ssh):
-    # COMMAND THAT WILL RUN ON SWITCH
-    cmd = "sh vl br | i (W-I|WKSTN|WKST)"
-    result = ssh.find_prompt() + "\n"
     # Send command to switch and get output
-    result += ssh.send_command(cmd, delay_factor=2)
+    result = ssh.send_command(VLAN_CMD, delay_factor=2)
+
+    return parse_workstation_vlans(result)
 
+# Pull the workstation VLAN IDs out of 'sh vl br' output
+# Parameters:
+#   result<String> = output of the VLAN command
+#
+# Return:
+#   vlans<Array[String]> = VLAN IDs of workstation VLANs
+def parse_workstation_vlans(result):
     # This is the entire output of the command split into an array by whitespace
     output = result.split()
 
@@ -74,17 +88,18 @@ def get_workstation_vlans(ssh):
 
     return vlans
 
-# Connect to an edge switch and get VLAN IDs for workstation VLANs
+# Connect to an edge switch and see if it has a VOIP template
+# Same answer as 'sh running-config | i VOIP', any config line that mentions VOIP
+# counts (presence.py's 'voip', not the template-only 'voip-template'). Stops reading
+# as soon as the first VOIP line shows up
 # Parameters:
 #   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   fast<Boolean> = use an exec channel, which the switch stops sending on right away
 #
 # Return:
-#   vlans<Array[String]> = VLAN IDs of workstation VLANs
-def check_voip(ssh):
-    # COMMAND THAT WILL RUN ON SWITCH
-    cmd = "sh running-config | i VOIP"
-    # Send command to switch and get output
-    return ssh.send_command(cmd, delay_factor=2)
+#   voip<String> = first line that mentions VOIP, empty if none
+def check_voip(ssh, fast=False):
+    return presence.ask(ssh, 'voip', fast=fast)
 
 # Main program logic
 #
@@ -100,17 +115,18 @@ def main():
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
+        # Each switch once, however many times it's in the file
+        switches = switchlist.hosts(sys.argv[1])
+        # Drop switches that are down before we try logging in to them
+        switches = probe.split_reachable(switches)
         # Get username and password for switches from keyboard
         user, password = user_input()
+        # netmiko takes a while to load, wait until we're about to log in
+        import netmiko
         print()
 
+        presence.load_cache(PRESENCE_CACHE)
+
         no = open('no-voip.txt', 'w')
         yes = open('yes-voip.txt', 'w') 
 
@@ -139,7 +155,8 @@ def main():
                         ssh.disconnect()
                         continue
 
-                voip = check_voip(ssh)
+                # Only need to know there's one VOIP line, stop at the first
+                voip = check_voip(ssh, fast=True)
 
                 # Just in case there are no workstation vlans on the switch, skip it
                 if len(voip) == 0:
@@ -159,7 +176,9 @@ def main():
                 print("!ERROR: Check hostname")
                 sys.exit(1)
         print()
-        f.close()
+        no.close()
+        yes.close()
+        presence.save_cache(PRESENCE_CACHE)
         # No switches are left in the list, we're done
         print("Done with all switches.")
         print("Exiting")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+# Title: kal.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: One command for every workflow in the repo, e.g. 'kal vlans switches.txt'
+#          instead of remembering which script does what. Only the script for the
+#          subcommand you ask for gets imported, and the scripts only load netmiko and
+#          paramiko once they're about to log in to something, so the offline and
+#          report subcommands start right away.
+#
+#          Usage: ./kal.py <command> [args ...]
+#                 ./kal.py help
+#
+# Dependencies:
+#          Whatever the subcommand's script needs
+
+# Import statements
+import sys
+import importlib
+
+# Subcommand -> (script module, arguments it always gets, what it does)
+# Order here is the order help lists them in
+COMMANDS = (
+        ('Switch sweeps (log in to every switch in the list)', (
+            ('vlans', 'fiveguys', (), 'workstation VLAN IDs -> workstation-vlans.txt'),
+            ('voip', 'got_voip', (), 'VOIP template applied? -> yes-voip.txt / no-voip.txt'),
+            ('template', 'got_template', (), 'VOIP template configured right? -> switch_template_check.txt'),
+            ('aging', 'got_template_adapted', (), 'port-security aging in the VOIP template'),
+            ('resnet', 'got_resnet', (), 'port-security aging in the resnet VOIP template'),
+            ('pub', 'pub_and_ip', (), 'public dot1x and VoIP VLAN IDs -> pub_and_ip_vlans.txt'),
+            ('pub-names', 'pub_and_ip_adapted', (), 'public dot1x VLAN names -> pub_vlan_names.txt'),
+            ('ports', 'fourpete', (), 'configure workstation access ports for VoIP'),
+            ('ports-v1', 'twoplay', (), 'earlier version of ports'),
+            ('play', 'play', (), 'workstation VLANs and ports on one switch (asks which)'),
+            ('collect', 'scpconfig', ('collect',), 'pull running configs over SCP -> configs/ (-p N processes)'),
+            ('apply', 'plan', ('apply',), 'push a saved port plan'),
+            ('rollback', 'rollback', (), 'undo the lines a port push actually sent'),
+            ('shard', 'shard', (), 'split a sweep over several jump hosts: coordinator | worker'))),
+        ('Quick checks (no login)', (
+            ('probe', 'probe', (), 'which switches answer on port 22 -> unreachable.txt'),
+            ('snmp', 'snmpvlans', (), 'VLAN tables over SNMP -> workstation-vlans.txt, vlan-table.txt'))),
+        ('Offline (from files already collected)', (
+            ('plan', 'plan', ('plan',), 'work out port changes from snapshots -> fourpete-plan.json'),
+            ('compliance', 'compliance', (), 'template rules against configs/ -> compliance.csv'),
+            ('index', 'configindex', (), 'search configs/: update | query <text> | regex <pattern>'),
+            ('vlanmap', 'vlanmap', (), 'VLAN set queries: query <term ...> | histogram'),
+            ('porttable', 'porttable', (), 'port table: build | count <columns> [filters]'),
+            ('archive', 'runarchive', (), 'per-switch output: list | show <switch> | extract [dir]'))),
+        ('Benchmarks', (
+            ('bench', 'fastexec', (), 'exec channel vs netmiko for one command'),
+            ('scp-bench', 'scpconfig', ('bench',), 'SCP vs show running-config'),
+            ('scale', 'scpconfig', ('scale',), 'SCP pulls with 1..N processes, throughput scaling'))))
+
+# Print every subcommand
+def usage():
+    print("Usage: kal <command> [args ...]")
+    for title, commands in COMMANDS:
+        print()
+        print(title + ":")
+        for name, module, _, about in commands:
+            print("  %-12s %s" % (name, about))
+    print()
+    print("Each command takes the same arguments as the script it runs (" +
+            "e.g. 'kal vlans <switch file>' is './fiveguys.py <switch file>')")
+
+# Find a subcommand
+# Return:
+#   (module, args, about), None if there's no such command
+def lookup(name):
+    for _, commands in COMMANDS:
+        for command, module, args, about in commands:
+            if command == name:
+                return module, args, about
+    return None
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('help', '-h', '--help'):
+        usage()
+        return
+
+    found = lookup(sys.argv[1])
+    if found is None:
+        print("!ERROR: No command " + sys.argv[1] + ", see 'kal help'")
+        sys.exit(1)
+    module, args, _ = found
+
+    # The script reads sys.argv as if it had been run on its own
+    sys.argv = ['kal ' + sys.argv[1]] + list(args) + sys.argv[2:]
+    importlib.import_module(module).main()
+
+# Execute the program
+if __name__ == "__main__":
+    main()
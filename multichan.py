@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Title: multichan.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Run the per-port 'sh run int' queries over several exec channels on the SSH
+#          connection netmiko already has open, instead of one after another on the
+#          interactive shell. If the switch won't open extra channels the rest go over
+#          the interactive shell as one batch (pipeline.py), one write and one read
+#          instead of a round trip per port. Prints how much faster it was than running
+#          serially.
+#
+# Dependencies:
+#          Netmiko python3 module (the ssh object passed in, paramiko underneath)
+
+# Import statements
+import time
+import threading
+import concurrent.futures
+import fastexec
+import pipeline
+
+# COMMAND THAT WILL RUN ON SWITCH (per access port)
+PORT_CMD = "sh run int %s | inc (max|desc|access|max|speed|duplex)|interface"
+# Seconds a batch of port queries on the interactive shell gets, plus this much per port
+BATCH_TIMEOUT = 60
+BATCH_TIMEOUT_PER_PORT = 5
+
+# Run one command on its own exec channel and read everything it prints
+# Parameters:
+#   transport<paramiko.Transport> = authenticated SSH transport
+#   cmd<String> = command to run
+#   timeout<Float> = seconds to wait for the channel and the output
+#
+# Return:
+#   output<String> = command output
+def exec_on_transport(transport, cmd, timeout=30):
+    return fastexec.decode(fastexec.exec_bytes(transport, cmd, timeout))
+
+# Get the authenticated transport out of a netmiko connection
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#
+# Return:
+#   transport<paramiko.Transport> = the transport, None if this isn't an SSH connection
+def get_transport(ssh):
+    conn = getattr(ssh, 'remote_conn', None)
+    if conn is None or not hasattr(conn, 'get_transport'):
+        return None
+    return conn.get_transport()
+
+# Run the per-port queries on the interactive shell in one batch (pipeline.py)
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   ports<Array[String]> = List of access ports
+#
+# Return:
+#   result<Array[String]> = Running config for each access port, same order as ports
+def send_port_batch(ssh, ports):
+    return pipeline.send_batch(ssh, [PORT_CMD % p for p in ports],
+            timeout=BATCH_TIMEOUT + BATCH_TIMEOUT_PER_PORT * len(ports))
+
+# Get the running config for a list of access ports over several channels at once
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   ports<Array[String]> = List of access ports
+#   channels<Int> = how many exec channels to run at once
+#   report<Function> = called with a one line speedup summary, None to stay quiet
+#
+# Return:
+#   result<Array[String]> = Running config for each access port, same order as ports
+def get_running_config(ssh, ports, channels=4, report=print):
+    start = time.monotonic()
+    transport = get_transport(ssh)
+    result = [None] * len(ports)
+    # Seconds each query took on its own, adds up to what a serial run would cost
+    spent = [0.0] * len(ports)
+    rejected = threading.Event()
+
+    def query(i):
+        if rejected.is_set():
+            return
+        t = time.monotonic()
+        try:
+            result[i] = exec_on_transport(transport, PORT_CMD % ports[i])
+        except Exception:
+            # Switch said no to another channel (or it died), the rest go in the batch
+            rejected.set()
+            return
+        spent[i] = time.monotonic() - t
+
+    if transport is not None and channels > 1 and len(ports) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=channels) as pool:
+            list(pool.map(query, range(len(ports))))
+
+    # Anything the channels didn't get goes over the interactive shell in one batch
+    left = [i for i in range(len(ports)) if result[i] is None]
+    serial = len(left)
+    if left:
+        t = time.monotonic()
+        outputs = send_port_batch(ssh, [ports[i] for i in left])
+        took = time.monotonic() - t
+        for i, output in zip(left, outputs):
+            result[i] = output
+            spent[i] = took / serial
+
+    if report and ports:
+        wall = time.monotonic() - start
+        if serial == len(ports):
+            report("-Extra channels not available, ran %d port queries in one batch" % serial)
+        else:
+            report("-Ran %d port queries over %d channels in %.1fs (%.1fx vs serial, %d fell back)" %
+                    (len(ports), channels, wall, sum(spent) / max(wall, 0.001), serial))
+
+    return result
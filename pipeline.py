@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Title: pipeline.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Send a batch of show commands to a switch in one write and read the
+#          combined output once, instead of a find_prompt() plus a send_command()
+#          round trip per command. The output is split back into one string per
+#          command using the prompt the switch prints after each one.
+#
+# Dependencies:
+#          Netmiko python3 module (the ssh object passed in)
+
+# Import statements
+import re
+import time
+
+# Send several commands to a switch at once and get each command's output back
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   commands<Array[String]> = show commands to run, in order
+#   prompt<String> = the switch prompt (e.g. 'SW-1#'). If not given, netmiko's cached
+#                    base_prompt is used so there's no extra find_prompt() round trip
+#   timeout<Float> = seconds to wait for the whole batch
+#
+# Return:
+#   outputs<Array[String]> = output of each command, same order as commands
+def send_batch(ssh, commands, prompt=None, timeout=60):
+    if len(commands) == 0:
+        return []
+    prompt_re = prompt_regex(ssh, prompt)
+
+    # Write the whole batch before reading anything. The switch runs the commands
+    # one after another and prints the prompt after each.
+    newline = getattr(ssh, 'RETURN', '\n')
+    ssh.write_channel(''.join(c + newline for c in commands))
+
+    buf = ''
+    deadline = time.monotonic() + timeout
+    while True:
+        chunk = ssh.read_channel()
+        if chunk:
+            buf += chunk.replace('\r\n', '\n').replace('\r', '')
+            # Done once the switch is sitting at the prompt after every command.
+            # Blank segments are stray prompts from empty lines, not commands.
+            tail = buf.rstrip().rsplit('\n', 1)[-1]
+            if prompt_re.fullmatch(tail):
+                segments = prompt_re.split(buf)[:-1]
+                if len([seg for seg in segments if seg.strip()]) >= len(commands):
+                    break
+        elif time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for %d commands, got %d prompts" %
+                    (len(commands), len(prompt_re.findall(buf))))
+        else:
+            time.sleep(0.05)
+
+    return split_output(buf, prompt_re, len(commands))
+
+# Build the regex that finds the switch prompt at the start of a line
+# Only matching at the start of a line keeps a config line that happens to contain
+# the hostname from splitting the output
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   prompt<String> = the switch prompt, None to use netmiko's base_prompt
+#
+# Return:
+#   prompt_re<Regex> = compiled prompt pattern
+def prompt_regex(ssh, prompt=None):
+    if prompt is not None:
+        return re.compile('^' + re.escape(prompt.strip()), re.M)
+    base = getattr(ssh, 'base_prompt', None)
+    if not base:
+        return re.compile('^' + re.escape(ssh.find_prompt().strip()), re.M)
+    # base_prompt is the hostname without the '#' or '>'
+    return re.compile('^' + re.escape(base) + '[>#]', re.M)
+
+# Split the combined output of a batch back into one output per command
+# Parameters:
+#   buf<String> = everything read from the channel for the batch
+#   prompt_re<Regex> = from prompt_regex()
+#   count<Int> = how many commands were sent
+#
+# Return:
+#   outputs<Array[String]> = output of each command without the echoed command line
+def split_output(buf, prompt_re, count):
+    segments = prompt_re.split(buf)
+    # Each prompt is followed by the next command's echo and output. Anything before
+    # the first prompt is the echo and output of the first command.
+    outputs = []
+    for seg in segments:
+        if len(outputs) == count:
+            break
+        # First line is the command the switch echoed back
+        first, _, rest = seg.partition('\n')
+        if not first.strip() and not rest.strip():
+            continue
+        outputs.append(rest.strip('\n'))
+
+    while len(outputs) < count:
+        outputs.append('')
+
+    return outputs
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+
+# Title: plan.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Split fourpete.py into two steps. 'plan' works out every per-port command
+#          block for the whole fleet from configs we already collected, without logging
+#          in to anything, and drops commands a port already has. 'apply' then logs in
+#          only to the switches that still need changes, several at once.
+#
+#          Snapshots are read from (first one found wins):
+#               configs/<switch>-running-config.txt (scpconfig.py) together with
+#                   the switch's -vlans to know which ports are workstation ports
+#               the switch's -before (fourpete.py)
+#          -vlans and -before come from run-archive.db (runarchive.py), or the old
+#          <switch>/<switch>-vlans.txt and -before.txt files.
+#
+#          Only a full config tells plan what a port already has. -before is filtered
+#          to 'max|desc|access|speed|duplex|interface' lines, so for a switch planned
+#          from it every template, power inline, logging and QoS line is sent again
+#          even if the port has it. plan says how many switches that was; run
+#          scpconfig.py first to plan just what's missing.
+#
+#          Usage:
+#               ./plan.py plan <switch file>     writes fourpete-plan.json and prints a summary
+#               ./plan.py apply [-q] [plan file] pushes the plan, -q for no live status line
+#
+# Dependencies:
+#          Netmiko python3 module (apply only)
+
+# Import statements
+import os
+import re
+import sys
+import json
+import getpass
+import fleet
+import progress
+import confparse
+import verify
+import runarchive
+import switchlist
+
+# Template every workstation port gets
+TEMPLATE = 'BX_VOIP_VLAN_361_TEMPLATE'
+# Where plan writes and apply reads
+PLAN_FILE = 'fourpete-plan.json'
+# Where scpconfig.py leaves full configs
+CONFIG_DIR = 'configs'
+# Every interface's full config, saved as 'before-full' right before a push
+BEFORE_CMD = 'sh run | section ^interface'
+
+# Work out the commands one access port needs, same as fourpete.py always has
+# Parameters:
+#   p<String> = running config of the port ('sh run int X | inc ...' output)
+#   switch<String> = switch hostname so we can tell if it's 3750 or 3850
+#
+# Return:
+#   commands<Array[String]> = 'interface X' followed by the config lines,
+#       None if p isn't an interface (e.g. the prompt got caught in the output)
+def port_commands(p, switch):
+    # Sometimes the switch name prompt gets caught in the runnig config
+    # We want to make sure we're working with only interfaces
+    if p.find("interface") == -1:
+        return None
+
+    # COMMANDS THAT WILL RUN ON SWITCH
+    commands = [
+            'no logging event link-status',
+            'power inline auto',
+            'source template ' + TEMPLATE]
+
+    # If we're working with a c3750 switch, we need to add two additional commands
+    if switch.find("3750") != -1:
+        commands.append("srr-queue bandwidth share 1 30 35 5")
+        commands.append("priority-queue out")
+
+    # should be 'interface GigabitEthernetX/X/XX'
+    iface = p[p.find("interface"):].split()
+    commands.insert(0, iface[0] + " " + iface[1])
+
+    # If the port has no port-security maximum set, set it to 2
+    if p.find("maximum") == -1:
+        commands.append("switchport port-security maximum 2")
+
+    return commands
+
+# Drop the commands a port already has
+# Parameters:
+#   commands<Array[String]> = from port_commands()
+#   p<String> = running config of the port
+#   full<Boolean> = p is the whole interface config, not the filtered one, so a
+#                   missing 'power inline' line means it's at the default (auto)
+#
+# Return:
+#   commands<Array[String]> = what's left, empty if the port needs nothing
+def drop_present(commands, p, full=False):
+    have = set(l.strip() for l in p.split('\n'))
+    needed = []
+    for c in commands[1:]:
+        if c in have:
+            continue
+        if full and c == 'power inline auto' and not any(l.startswith('power inline') for l in have):
+            continue
+        needed.append(c)
+    if not needed:
+        return []
+    return [commands[0]] + needed
+
+# Write command blocks as text, the way fourpete.py and apply_plan() save what they
+# sent ('config' in the run archive), split_ports() reads it back
+def format_blocks(blocks):
+    return '\n'.join(block[0] + ''.join('\n ' + c for c in block[1:]) for block in blocks)
+
+# Split fourpete.py's -before snapshot back into one config string per port
+def split_ports(text):
+    ports = []
+    for line in text.replace('\r', '').split('\n'):
+        if line.startswith('interface '):
+            ports.append(line)
+        elif ports and line.strip():
+            ports[-1] += '\n' + line
+    return ports
+
+# Find the newest snapshot we have for a switch
+# Parameters:
+#   switch<String> = switch hostname
+#   root<String> = directory the snapshots live under
+#
+# Return:
+#   ports<Array[String]> = config of each workstation access port
+#   full<Boolean> = True if those are whole interface configs
+#   None, None if there's no snapshot
+def load_snapshot(switch, root='.'):
+    config_path = os.path.join(root, CONFIG_DIR, switch + '-running-config.txt')
+    vlans_text = runarchive.read(switch, 'vlans', root)
+
+    if os.path.exists(config_path) and vlans_text is not None:
+        vlans = set(v.strip().rstrip('p') for v in vlans_text.split() if v.strip())
+        f = open(config_path)
+        config = f.read()
+        f.close()
+        ports = []
+        for name, block in confparse.interfaces(config).items():
+            m = re.search(r'switchport access vlan (\d+)', '\n'.join(block))
+            if m and m.group(1) in vlans:
+                ports.append('\n'.join(block))
+        return ports, True
+
+    text = runarchive.read(switch, 'before', root)
+    if text is not None:
+        return split_ports(text), False
+
+    return None, None
+
+# Work out what every switch needs without logging in
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   root<String> = directory the snapshots live under
+#
+# Return:
+#   plan<Dict{String: Array[Array[String]]}> = switch -> one command block per port
+#       that needs changes (empty list if nothing to do)
+#   missing<Array[String]> = switches with no snapshot
+#   filtered<Array[String]> = switches planned from the filtered -before, where lines
+#       the port already has can't be dropped
+def make_plan(switches, root='.'):
+    plan = {}
+    missing = []
+    filtered = []
+    for s in switches:
+        ports, full = load_snapshot(s, root)
+        if ports is None:
+            missing.append(s)
+            continue
+        if not full:
+            filtered.append(s)
+        blocks = []
+        for p in ports:
+            commands = port_commands(p, s)
+            if commands is None:
+                continue
+            commands = drop_present(commands, p, full)
+            if commands:
+                blocks.append(commands)
+        plan[s] = blocks
+    return plan, missing, filtered
+
+# Save a plan for apply
+def save_plan(plan, path=PLAN_FILE):
+    f = open(path, 'w')
+    json.dump(plan, f, indent=1)
+    f.close()
+
+# Load a saved plan
+def load_plan(path=PLAN_FILE):
+    f = open(path)
+    plan = json.load(f)
+    f.close()
+    return plan
+
+# Push a plan to every switch that has something to do, concurrently
+# Parameters:
+#   plan<Dict{String: Array[Array[String]]}> = from make_plan()
+#   user<String> = username
+#   password<String> = password
+#   progress<Progress> = progress.py status line, fleet.py's default if not given
+#
+# Return:
+#   results<Dict{String: (String, Object)}> = from fleet.run_fleet(), the value is the
+#       commands sent to that switch. A switch where a port failed verification
+#       (verify.py) comes back as an error
+def apply_plan(plan, user, password, progress=print):
+    import netmiko
+
+    todo = [s for s, blocks in plan.items() if blocks]
+
+    def job(s, timed):
+        commands = [c for block in plan[s] for c in block]
+        with timed('connect'):
+            ssh = netmiko.ConnectHandler(
+                    device_type = 'cisco_ios',
+                    ip = s,
+                    username = user,
+                    password = password)
+            ssh.enable()
+        try:
+            # Full interface config before the push, so rollback.py knows exactly
+            # what to put back
+            with timed('command'):
+                before = ssh.send_command(BEFORE_CMD, delay_factor=2)
+            runarchive.write(s, 'before-full', before)
+            # Record what's being sent before sending it, so a push that times out
+            # partway or a verify that blows up still leaves rollback.py something to undo
+            runarchive.write(s, 'config', format_blocks(plan[s]))
+            # Every port on the switch goes in one config session
+            with timed('command'):
+                output = ssh.send_config_set(commands)
+            runarchive.write(s, 'config-output', output)
+            # Check just the lines we changed, one query for the whole switch
+            with timed('command'):
+                checked, bad_ports = verify.verify_switch(ssh, plan[s])
+        finally:
+            ssh.disconnect()
+
+        passed, failed = verify.write_report(s, checked, bad_ports)
+        if failed:
+            raise RuntimeError("%d of %d ports failed verification, see ./runarchive.py show %s verify" %
+                    (failed, passed + failed, s))
+        return commands
+
+    return fleet.run_fleet(todo, job, progress=progress)
+
+# Main program logic
+#
+def main():
+    tracker = progress.Progress.from_argv()
+    if len(sys.argv) < 2 or sys.argv[1] not in ('plan', 'apply'):
+        print("!ERROR: usage: plan.py plan <switch file>")
+        print("               plan.py apply [-q] [plan file]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'plan':
+        if len(sys.argv) < 3:
+            print("!ERROR: You need to specify the file containing switches")
+            sys.exit(1)
+        plan, missing, filtered = make_plan(switchlist.hosts(sys.argv[2]))
+        save_plan(plan)
+        changes = [s for s in plan if plan[s]]
+        print("*%d switches planned, %d need changes (%d ports), %d already done" %
+                (len(plan), len(changes), sum(len(plan[s]) for s in changes),
+                    len(plan) - len(changes)))
+        for s in missing:
+            print("!No snapshot for " + s + ", collect it first")
+        if filtered:
+            print("!%d switches planned from fourpete.py's filtered -before, lines their ports "
+                    "already have get sent again (scpconfig.py configs fix that)" % len(filtered))
+        print("*Plan written to " + PLAN_FILE)
+        return
+
+    plan = load_plan(sys.argv[2] if len(sys.argv) > 2 else PLAN_FILE)
+    todo = [s for s in plan if plan[s]]
+    print("This will push the plan to %d switches (%d ports)." %
+            (len(todo), sum(len(plan[s]) for s in todo)))
+    go = input("Are you ready to get started? (y/N): ").lower()
+    if go != 'y':
+        print("!ERROR: User canceled")
+        sys.exit(1)
+    try:
+        user = input("Enter username: ")
+        password = getpass.getpass("Enter password: ")
+    except KeyboardInterrupt:
+        print()
+        print("!ERROR: Caught KeyboardInterrupt, exiting")
+        sys.exit(1)
+
+    results = apply_plan(plan, user, password, tracker)
+    failed = [s for s, (status, _) in results.items() if status != 'ok']
+    for s in failed:
+        print("!ERROR: " + s + ": " + str(results[s][1]))
+    print("Done with all switches. %d changed, %d failed" % (len(results) - len(failed), len(failed)))
+    print("Exiting")
+
+# Execute the program
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,8 @@
 # Import statements
 import sys
 import socket
-import paramiko
 import getpass
+import fastexec
 
 def user_input():
     try:
@@ -18,26 +18,24 @@ def user_input():
 
     return str(switch), str(user), str(password)
 
+# Open clients, kept around so running several commands only logs in once
+FAST = {}
+
 def execute(hst, usr, passwd, cmd):
-    ssh = paramiko.SSHClient()
-    # Set AutoAddPolicy so that we are not prompted to add new hosts to know_hosts file
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    # paramiko takes a while to load, only pull it in once we connect
+    import paramiko
+    if (usr, passwd) not in FAST:
+        FAST[(usr, passwd)] = fastexec.ExecTransport(usr, passwd)
     try:
         # All PittNET switches run SSH on default port 22
-        # look_for_keys=False keeps script from trying to use keypair, we want plaintext passwd
-        ssh.connect(hst, 22, usr, passwd, look_for_keys=False)
-        # stdin, stdout, sterr are all set here, could write if needed
-        #stdin, stdout, stderr = ssh.exec_command("terminal length 0")
-        stdin, stdout, stderr = ssh.exec_command(cmd)
-        output = stdout.read().strip()
+        # Exec channel has no pty so the switch doesn't page, no terminal length needed
+        output = FAST[(usr, passwd)].run(hst, cmd)
 
     except paramiko.ssh_exception.AuthenticationException as e:
         print("Authentication failure!")
         sys.exit(1)
 
-    # stdout is written in 'bytes'. Needs to be decoded before priting
-    ssh.close()
-    return output.decode(encoding='UTF-8')
+    return output
 
 def check_host(host):
     try:
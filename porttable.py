@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+# Title: porttable.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: One table of every access port in the fleet, so questions like "how many
+#          ports per VLAN" or "which ports have no port-security maximum" don't mean
+#          re-parsing thousands of per-switch text files. Each column is stored on its
+#          own in a NumPy structured array, and the text columns (switch, port,
+#          description, ...) are dictionary encoded: every distinct string is kept once
+#          and the table just holds its number. A few hundred thousand ports is a few MB.
+#
+#          Built from (first one found wins per switch):
+#               configs/<switch>-running-config.txt (scpconfig.py), every interface
+#               the switch's -before in run-archive.db or <switch>/<switch>-before.txt
+#                   (fourpete.py), the workstation ports
+#
+#          Usage:
+#               ./porttable.py build [config dir]
+#                   writes port-table.npz
+#               ./porttable.py count <column>[,<column>...] [column=value[,value...] ...]
+#                   port counts grouped by the columns, only ports matching every filter
+#                   e.g. ./porttable.py count vlan,speed switch=sw-3850-2
+#                        ./porttable.py count switch maximum=-1 mode=access
+#
+# Dependencies:
+#          NumPy python3 module
+
+# Import statements
+import os
+import re
+import sys
+import time
+import numpy
+import plan
+import confparse
+import runarchive
+
+# Where scpconfig.py leaves full configs
+CONFIG_DIR = 'configs'
+# Where the table goes
+TABLE_FILE = 'port-table.npz'
+# Dictionary encoded text columns
+STRING_COLUMNS = ('switch', 'port', 'mode', 'speed', 'duplex', 'template', 'description')
+# Number columns, -1 means the port doesn't set it
+INT_COLUMNS = ('vlan', 'voice', 'maximum')
+# One row of the table
+ROW = numpy.dtype([(c, numpy.uint32) for c in STRING_COLUMNS] +
+        [(c, numpy.int16) for c in INT_COLUMNS] +
+        [('shutdown', numpy.bool_)])
+
+# Interface lines we know how to read, line pattern -> column
+PORT_LINES = (
+        (re.compile(r'^switchport access vlan (\d+)'), 'vlan'),
+        (re.compile(r'^switchport voice vlan (\d+)'), 'voice'),
+        (re.compile(r'^switchport port-security maximum (\d+)$'), 'maximum'),
+        (re.compile(r'^switchport mode (\S+)'), 'mode'),
+        (re.compile(r'^speed (\S+)'), 'speed'),
+        (re.compile(r'^duplex (\S+)'), 'duplex'),
+        (re.compile(r'^source template (\S+)'), 'template'),
+        (re.compile(r'^description (.*)'), 'description'))
+
+# Read one interface stanza
+# Parameters:
+#   lines<Array[String]> = 'interface X' and the lines under it
+#
+# Return:
+#   port<Dict> = column -> value, missing columns are '' or -1
+def parse_port(lines):
+    port = dict((c, '') for c in STRING_COLUMNS)
+    port.update((c, -1) for c in INT_COLUMNS)
+    port['shutdown'] = False
+    port['port'] = confparse.long_port_name(lines[0].split(None, 1)[1].strip())
+    for line in lines[1:]:
+        line = line.strip()
+        if line == 'shutdown':
+            port['shutdown'] = True
+            continue
+        for regex, column in PORT_LINES:
+            m = regex.match(line)
+            if m:
+                port[column] = int(m.group(1)) if column in INT_COLUMNS else m.group(1)
+                break
+    return port
+
+# Every string kept once, with a number for each
+class Strings:
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = dict((v, i) for i, v in enumerate(self.values))
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+# The fleet port table
+# Parameters:
+#   rows<numpy.ndarray> = structured array of ROW
+#   strings<Dict{String: Strings}> = column -> dictionary for the text columns
+class PortTable:
+    def __init__(self, rows, strings):
+        self.rows = rows
+        self.strings = strings
+
+    # Build a table from parsed ports
+    # Parameters:
+    #   ports<Iterable[Dict]> = parse_port() results with 'switch' filled in
+    @classmethod
+    def from_ports(cls, ports):
+        strings = dict((c, Strings()) for c in STRING_COLUMNS)
+        records = []
+        for p in ports:
+            records.append(tuple(strings[c].code(p[c]) for c in STRING_COLUMNS) +
+                    tuple(p[c] for c in INT_COLUMNS) + (p['shutdown'],))
+        return cls(numpy.array(records, dtype=ROW), strings)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # Ports matching every filter, like 'vlan=361 mode=access'
+    # Parameters:
+    #   mask<numpy.ndarray> = start from these rows, None for all
+    #   filters = column=value or column=[values], any value matches
+    #
+    # Return:
+    #   mask<numpy.ndarray> = bool per row
+    def where(self, mask=None, **filters):
+        if mask is None:
+            mask = numpy.ones(len(self.rows), dtype=bool)
+        for column, want in filters.items():
+            if column not in ROW.names:
+                raise ValueError("No column " + column + ", columns are " + ', '.join(ROW.names))
+            if not isinstance(want, (list, tuple, set)):
+                want = [want]
+            if column in self.strings:
+                codes = self.strings[column].codes
+                want = [codes[w] for w in want if w in codes]
+            mask = mask & numpy.isin(self.rows[column], numpy.array(list(want), dtype=self.rows.dtype[column]))
+        return mask
+
+    # Count ports grouped by one or more columns
+    # Parameters:
+    #   columns<Array[String]> = columns to group by
+    #   mask<numpy.ndarray> = only count these rows, None for all
+    #
+    # Return:
+    #   groups<Array[(Tuple, Int)]> = (column values, port count), biggest first
+    def group_count(self, columns, mask=None):
+        for column in columns:
+            if column not in ROW.names:
+                raise ValueError("No column " + column + ", columns are " + ', '.join(ROW.names))
+        rows = self.rows if mask is None else self.rows[mask]
+        if len(rows) == 0:
+            return []
+        keys = numpy.stack([rows[c].astype(numpy.int64) for c in columns], axis=1)
+        # Pack the key columns into one number when they fit, sorting one column of
+        # int64 is a lot faster than numpy.unique(axis=0)
+        low = keys.min(axis=0)
+        sizes = keys.max(axis=0) - low + 1
+        if numpy.prod(sizes.astype(float)) < 2 ** 62:
+            packed = numpy.zeros(len(keys), dtype=numpy.int64)
+            for i in range(len(columns)):
+                packed = packed * sizes[i] + (keys[:, i] - low[i])
+            packed, counts = numpy.unique(packed, return_counts=True)
+            unique = numpy.zeros((len(packed), len(columns)), dtype=numpy.int64)
+            for i in reversed(range(len(columns))):
+                unique[:, i] = packed % sizes[i] + low[i]
+                packed = packed // sizes[i]
+        else:
+            unique, counts = numpy.unique(keys, axis=0, return_counts=True)
+        order = numpy.argsort(-counts, kind='stable')
+        groups = []
+        for i in order:
+            key = []
+            for column, value in zip(columns, unique[i]):
+                if column in self.strings:
+                    key.append(self.strings[column].values[value])
+                elif column == 'shutdown':
+                    key.append(bool(value))
+                else:
+                    key.append(int(value))
+            groups.append((tuple(key), int(counts[i])))
+        return groups
+
+    # Save to an .npz, the dictionaries go in as one newline separated string each
+    def save(self, path=TABLE_FILE):
+        arrays = {'rows': self.rows}
+        for column, s in self.strings.items():
+            arrays['strings_' + column] = numpy.array('\n'.join(s.values))
+        numpy.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path=TABLE_FILE):
+        data = numpy.load(path)
+        strings = dict((c, Strings(str(data['strings_' + c]).split('\n'))) for c in STRING_COLUMNS)
+        return cls(data['rows'], strings)
+
+    # Bytes the table takes up in memory, rows plus dictionaries
+    def nbytes(self):
+        return self.rows.nbytes + sum(len(v) for s in self.strings.values() for v in s.values)
+
+# Read every port we have a snapshot for
+# Parameters:
+#   config_dir<String> = where scpconfig.py saved configs
+#   root<String> = directory with run-archive.db and older fourpete.py switch directories
+#
+# Return:
+#   ports<Generator[Dict]> = parse_port() results with 'switch' filled in
+def collect_ports(config_dir=CONFIG_DIR, root='.'):
+    suffix = '-running-config.txt'
+    seen = set()
+    if os.path.isdir(config_dir):
+        for name in sorted(os.listdir(config_dir)):
+            if not name.endswith(suffix):
+                continue
+            s = name[:-len(suffix)]
+            seen.add(s)
+            f = open(os.path.join(config_dir, name), errors='replace')
+            config = f.read()
+            f.close()
+            for block in confparse.interfaces(config).values():
+                port = parse_port(block)
+                port['switch'] = s
+                yield port
+
+    for s in runarchive.switches_with('before', root):
+        if s in seen:
+            continue
+        text = runarchive.read(s, 'before', root)
+        for p in plan.split_ports(text):
+            port = parse_port(p.split('\n'))
+            port['switch'] = s
+            yield port
+
+# Turn 'column=a,b' arguments into where() filters
+def parse_filters(args):
+    filters = {}
+    for a in args:
+        column, _, value = a.partition('=')
+        values = value.split(',')
+        if column in INT_COLUMNS:
+            values = [int(v) for v in values]
+        elif column == 'shutdown':
+            values = [v.lower() in ('1', 'yes', 'true') for v in values]
+        filters[column] = values
+    return filters
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'count') or \
+            (sys.argv[1] == 'count' and len(sys.argv) < 3):
+        print("!ERROR: usage: porttable.py build [config dir]")
+        print("               porttable.py count <column>[,<column>...] [column=value ...]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'build':
+        start = time.time()
+        table = PortTable.from_ports(collect_ports(sys.argv[2] if len(sys.argv) > 2 else CONFIG_DIR))
+        table.save()
+        print("*%d ports from %d switches in %.1f s, %.1f MB in memory" %
+                (len(table), len(table.strings['switch'].values), time.time() - start,
+                    table.nbytes() / 1048576.0))
+        print("*Table written to " + TABLE_FILE)
+        return
+
+    if not os.path.exists(TABLE_FILE):
+        print("!ERROR: No " + TABLE_FILE + ", run porttable.py build first")
+        sys.exit(1)
+    table = PortTable.load()
+    start = time.time()
+    try:
+        columns = sys.argv[2].split(',')
+        mask = table.where(**parse_filters(sys.argv[3:]))
+        groups = table.group_count(columns, mask)
+    except ValueError as e:
+        print("!ERROR: " + str(e))
+        sys.exit(1)
+    took = time.time() - start
+    for key, count in groups:
+        print("  %7d  %s" % (count, '  '.join(str(k) if k != '' else '-' for k in key)))
+    print("-%d of %d ports in %d groups, %.1f ms" % (int(mask.sum()), len(table), len(groups), took * 1000))
+
+# Execute the program
+if __name__ == "__main__":
+    main()
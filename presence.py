@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# Title: presence.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Answer yes/no questions about a switch ("does it have a VOIP template?")
+#          with the cheapest command the platform supports, and stop reading the
+#          moment the answer is known. 'sh running-config | i VOIP' makes the switch
+#          render its whole config, the template section is a lot smaller.
+#
+#          Commands for each question are tried cheapest first. The first one a
+#          platform accepts is remembered, so the rest of the fleet on that platform
+#          goes straight to it. The choices can be saved to a file for later runs.
+#
+#          Every command for a question has to look at the same part of the config,
+#          or the answer changes with the platform. 'voip' is got_voip.py's question,
+#          VOIP anywhere in the config (VLAN names, descriptions and policy maps
+#          count, not just templates), so it only has the full config search and
+#          the saving is the early stop. 'voip-template' only looks at templates and
+#          can say no where 'voip' says yes.
+#
+# Dependencies:
+#          Netmiko python3 module (the ssh object passed in)
+
+# Import statements
+import json
+import threading
+import multichan
+import streamparse
+
+# Questions we know how to answer
+#   needle -- text that means "yes" if it shows up in the output
+#   commands -- platform -> commands to try, cheapest first
+QUESTIONS = {
+    # VOIP anywhere in the config, same as 'sh running-config | i VOIP' always said
+    'voip': {
+        'needle': 'VOIP',
+        'commands': {
+            'default': [
+                "sh running-config | i VOIP"],
+        },
+    },
+    # VOIP in a template, a no here can still be a yes for 'voip'
+    'voip-template': {
+        'needle': 'VOIP',
+        'commands': {
+            '3850': [
+                "show template interface source user all | i VOIP",
+                "sh run | sec ^template"],
+            'default': [
+                "sh run | sec ^template"],
+        },
+    },
+}
+
+# Messages IOS prints when it doesn't know a command
+REJECTED = ('% Invalid input', '% Incomplete command', '% Ambiguous command', '% Unrecognized command')
+
+# platform, question -> command that platform accepted
+CACHE = {}
+_lock = threading.Lock()
+
+# Figure out the platform from the switch hostname, same way fourpete.py tells
+# a 3750 from a 3850
+# Parameters:
+#   switch<String> = switch hostname
+#
+# Return:
+#   platform<String> = '3750', '3850' or 'default'
+def platform_of(switch):
+    for p in ('3750', '3850'):
+        if p in switch:
+            return p
+    return 'default'
+
+# Parser that stops on the first line with the needle, or on a rejected command
+class PresenceCheck(streamparse.FirstMatch):
+    def __init__(self, needle):
+        streamparse.FirstMatch.__init__(self, needle)
+        self.rejected = False
+
+    def feed(self, line):
+        if line.strip().startswith(REJECTED):
+            self.rejected = True
+            return True
+        return streamparse.FirstMatch.feed(self, line)
+
+# Run one command and see if the needle shows up
+# Return:
+#   (rejected<Boolean>, match<String>)
+def _ask(ssh, cmd, needle, fast):
+    transport = multichan.get_transport(ssh) if fast else None
+    if transport is not None:
+        lines = streamparse.stream_exec(transport, cmd)
+    else:
+        lines = streamparse.stream_command(ssh, cmd)
+    parser = PresenceCheck(needle)
+    match = streamparse.parse(lines, parser)
+    return parser.rejected, match
+
+# Ask a switch a yes/no question
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   question<String> = key in QUESTIONS, e.g. 'voip'
+#   switch<String> = switch hostname, taken from the connection if not given
+#   fast<Boolean> = use an exec channel, which the switch stops sending on right away
+#
+# Return:
+#   match<String> = first line that answered yes, empty string for no
+def ask(ssh, question, switch=None, fast=True):
+    q = QUESTIONS[question]
+    if switch is None:
+        switch = getattr(ssh, 'host', '')
+    platform = platform_of(switch)
+    candidates = q['commands'].get(platform, q['commands']['default'])
+
+    with _lock:
+        known = CACHE.get((platform, question))
+    # A cache from an older run can name a command the question no longer uses
+    if known in candidates:
+        candidates = [known] + [c for c in candidates if c != known]
+
+    for cmd in candidates:
+        rejected, match = _ask(ssh, cmd, q['needle'], fast)
+        if not rejected:
+            with _lock:
+                CACHE[(platform, question)] = cmd
+            return match
+
+    raise ValueError("No command for '" + question + "' works on " + switch)
+
+# Load saved platform -> command choices
+# Parameters:
+#   path<String> = JSON file written by save_cache()
+def load_cache(path):
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (IOError, ValueError):
+        return
+    with _lock:
+        for key, cmd in saved.items():
+            platform, question = key.split('/', 1)
+            CACHE[(platform, question)] = cmd
+
+# Save platform -> command choices for the next run
+# Parameters:
+#   path<String> = JSON file to write
+def save_cache(path):
+    with _lock:
+        saved = dict((p + '/' + q, cmd) for (p, q), cmd in CACHE.items())
+    with open(path, 'w') as f:
+        json.dump(saved, f, indent=2, sort_keys=True)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Title: probe.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Before logging in to anything, try a TCP connect to port 22 on every switch
+#          in the list at the same time with a short timeout. Switches that don't
+#          resolve or don't answer go in their own report, and only the live ones are
+#          handed to the SSH stage. A dead switch costs a fraction of a second here
+#          instead of a full netmiko connect timeout.
+#
+#          Usage: ./probe.py <switch file> [timeout]
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import sys
+import time
+import socket
+import asyncio
+import switchlist
+import concurrent.futures
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Where the dead switches get written
+REPORT_FILE = 'unreachable.txt'
+
+# Most sockets open at once, kept under the open file limit
+def _max_open(wanted):
+    if resource is None:
+        return wanted
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return max(1, min(wanted, soft - 64))
+
+# Try one switch
+# The lookup isn't timed, a slow DNS answer isn't a dead switch. Only the connect is.
+# Return:
+#   reason<String> = None if port 22 answered, otherwise why not
+async def _probe(host, port, timeout, limit):
+    loop = asyncio.get_running_loop()
+    async with limit:
+        try:
+            info = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            return 'does not resolve'
+        addr = info[0][4]
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(addr[0], port), timeout)
+        except asyncio.TimeoutError:
+            return 'timed out'
+        except ConnectionRefusedError:
+            return 'connection refused'
+        except OSError as e:
+            return e.strerror or str(e)
+        writer.close()
+        return None
+
+# Probe a whole list of switches at once
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   port<Int> = port to try, 22 for SSH
+#   timeout<Float> = seconds to wait for each switch
+#   concurrency<Int> = most connects in flight at once
+#
+# Return:
+#   live<Array[String]> = switches that answered, in list order
+#   dead<Dict{String: String}> = switch -> reason, in list order
+def probe(switches, port=22, timeout=1.5, concurrency=2000):
+    async def run():
+        size = _max_open(concurrency)
+        limit = asyncio.Semaphore(size)
+        # getaddrinfo() blocks, so it runs in the loop's executor. The default one
+        # only has a few threads, give it one per switch that can be in flight.
+        resolvers = concurrent.futures.ThreadPoolExecutor(max(1, min(size, len(switches))))
+        asyncio.get_running_loop().set_default_executor(resolvers)
+        return await asyncio.gather(*[_probe(s, port, timeout, limit) for s in switches])
+
+    reasons = asyncio.run(run())
+    live = []
+    dead = {}
+    for s, reason in zip(switches, reasons):
+        if reason is None:
+            live.append(s)
+        else:
+            dead[s] = reason
+    return live, dead
+
+# Probe the list, write the dead ones to a report and hand back the live ones
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   report<String> = file for unreachable switches, one 'switch: reason' per line
+#   timeout<Float> = seconds to wait for each switch
+#
+# Return:
+#   live<Array[String]> = switches worth logging in to
+def split_reachable(switches, report=REPORT_FILE, timeout=1.5):
+    start = time.monotonic()
+    # Blank lines in the switch file aren't switches
+    switches = [s for s in switches if s]
+    live, dead = probe(switches, timeout=timeout)
+    print("*Probed %d switches in %.1fs: %d up, %d unreachable" %
+            (len(switches), time.monotonic() - start, len(live), len(dead)))
+    if dead:
+        f = open(report, 'w')
+        for s, reason in dead.items():
+            f.write(s + ": " + reason + '\n')
+        f.close()
+        print("!Unreachable switches written to " + report)
+    return live
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) == 1:
+        print("!ERROR: You need to specify the file containing switches")
+        sys.exit(1)
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 1.5
+
+    switches = switchlist.hosts(sys.argv[1])
+
+    for s in split_reachable(switches, timeout=timeout):
+        print(s)
+
+# Execute the program
+if __name__ == "__main__":
+    main()
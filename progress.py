@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+# Title: progress.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: One status line for a fleet.py run instead of a few lines per switch.
+#          Shows done/failed/in-flight counts, switches per second and an ETA (both
+#          over the last WINDOW seconds, so they follow the run as it speeds up or
+#          slows down) and the switches that have been in flight the longest. It's
+#          redrawn by one thread every REFRESH seconds, so the worker threads never
+#          touch the console; they just update a few counters.
+#
+#          On a terminal the line is redrawn in place and notes scroll by above it.
+#          When output goes to a file it's written as a plain line every LOG_EVERY
+#          seconds. In quiet mode (-q or --quiet on the scripts that use fleet.py)
+#          there's no status line at all, just the summary at the end. Either way the
+#          failures are only counted here, the scripts list every switch that failed
+#          with its error once the run is over.
+#
+#          Usage: progress = Progress.from_argv()     strips -q/--quiet from sys.argv
+#                 fleet.run_fleet(switches, job, progress=progress)
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import sys
+import time
+import shutil
+import threading
+import collections
+
+# Seconds between redraws of the status line
+REFRESH = 0.5
+# Seconds between status lines when output isn't a terminal
+LOG_EVERY = 10
+# Seconds of finished switches the rate and ETA are worked out from
+WINDOW = 30
+# In-flight switches to name, longest running first
+SLOWEST = 3
+# Command line flags that turn on quiet mode
+QUIET_FLAGS = ('-q', '--quiet')
+
+# Turn seconds into something short like 45s, 3m05s or 1h02m
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return "%ds" % seconds
+    if seconds < 3600:
+        return "%dm%02ds" % (seconds // 60, seconds % 60)
+    return "%dh%02dm" % (seconds // 3600, seconds % 3600 // 60)
+
+# Live progress for a fleet.py run
+# fleet.run_fleet() calls begin(), started(), finished() and end(), the rest is internal
+# Parameters:
+#   quiet<Boolean> = no status line or notes, just the summary at the end
+#   out<File> = where to write, stdout if not given
+#   refresh<Float> = seconds between redraws
+class Progress:
+    def __init__(self, quiet=False, out=None, refresh=REFRESH):
+        self.quiet = quiet
+        self.out = out if out is not None else sys.stdout
+        self.refresh = refresh
+        self.live = not quiet and hasattr(self.out, 'isatty') and self.out.isatty()
+        self.total = 0
+        self.done = 0
+        self.failed = collections.Counter()
+        self.in_flight = {}
+        self.finish_times = collections.deque()
+        self.notes = []
+        self.limiter = None
+        self.start = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._width = 0
+
+    # Build one from the command line, taking the quiet flag out of sys.argv so the
+    # script's own argument handling never sees it
+    @classmethod
+    def from_argv(cls, argv=None):
+        argv = sys.argv if argv is None else argv
+        quiet = any(a in QUIET_FLAGS for a in argv[1:])
+        argv[1:] = [a for a in argv[1:] if a not in QUIET_FLAGS]
+        return cls(quiet=quiet)
+
+    # A run is starting
+    # Parameters:
+    #   total<Int> = switches in the run
+    #   limiter<AIMDLimiter> = fleet.py's limiter, for the current limit
+    def begin(self, total, limiter=None):
+        self.total = total
+        self.limiter = limiter
+        self.start = time.monotonic()
+        if not self.quiet:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    # A switch has been handed to a worker
+    def started(self, switch):
+        with self._lock:
+            self.in_flight[switch] = time.monotonic()
+
+    # A switch went back in the queue without finishing (shard.py hands it to
+    # another worker)
+    def returned(self, switch):
+        with self._lock:
+            self.in_flight.pop(switch, None)
+
+    # A line to show above the status line, printed as-is when there isn't one
+    def note(self, line):
+        with self._lock:
+            if self._thread is not None:
+                self.notes.append(line)
+                return
+        print(line, file=self.out)
+
+    # A switch is done
+    # Parameters:
+    #   switch<String> = hostname
+    #   status<String> = 'ok', or a fleet.classify_error() result
+    #   value<Object> = job result, the exception if it failed
+    def finished(self, switch, status, value=None):
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight.pop(switch, None)
+            self.done += 1
+            self.finish_times.append(now)
+            # The script lists the error at the end, here it's just counted
+            if status != 'ok':
+                self.failed[status] += 1
+
+    # The run is over, draw the last line and print the summary
+    def end(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._draw(final=True)
+        print(self.summary(), file=self.out)
+        self.out.flush()
+
+    # Switches per second over the last WINDOW seconds
+    def rate(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            while self.finish_times and self.finish_times[0] < now - WINDOW:
+                self.finish_times.popleft()
+            recent = len(self.finish_times)
+        span = min(WINDOW, now - self.start) if self.start is not None else 0
+        return recent / span if span > 0 else 0.0
+
+    # The status line
+    def status(self, now=None):
+        now = time.monotonic() if now is None else now
+        rate = self.rate(now)
+        with self._lock:
+            done = self.done
+            failed = sum(self.failed.values())
+            slowest = sorted(self.in_flight.items(), key=lambda item: item[1])[:SLOWEST]
+            flying = len(self.in_flight)
+        left = self.total - done
+        eta = format_duration(left / rate) if rate > 0 else '?'
+        if left == 0:
+            eta = '0s'
+        line = "[%d/%d] failed=%d in-flight=%d" % (done, self.total, failed, flying)
+        if self.limiter is not None:
+            line += " limit=%d" % self.limiter.current()
+        line += " %.1f/s eta %s" % (rate, eta)
+        if slowest:
+            line += " | slowest: " + ', '.join("%s %s" % (s, format_duration(now - t)) for s, t in slowest)
+        return line
+
+    # One line for the end of the run
+    def summary(self):
+        took = time.monotonic() - self.start if self.start is not None else 0
+        line = "*%d switches in %s (%.1f/s), %d ok, %d failed" % (self.done, format_duration(took),
+                self.done / took if took > 0 else 0.0, self.done - sum(self.failed.values()),
+                sum(self.failed.values()))
+        if self.failed:
+            line += " (" + ', '.join("%s %d" % kind for kind in sorted(self.failed.items())) + ")"
+        return line
+
+    def _run(self):
+        last_log = time.monotonic()
+        while not self._stop.wait(self.refresh):
+            if self.live:
+                self._draw()
+            else:
+                self._flush_notes()
+                if time.monotonic() - last_log >= LOG_EVERY:
+                    last_log = time.monotonic()
+                    print(self.status(), file=self.out)
+                    self.out.flush()
+
+    def _flush_notes(self):
+        with self._lock:
+            notes, self.notes = self.notes, []
+        for e in notes:
+            print(e, file=self.out)
+
+    # Notes above, then the status line redrawn in place
+    def _draw(self, final=False):
+        if not self.live:
+            self._flush_notes()
+            if final:
+                print(self.status(), file=self.out)
+            return
+        width = shutil.get_terminal_size().columns - 1
+        with self._lock:
+            notes, self.notes = self.notes, []
+        text = ''
+        for e in notes:
+            text += '\r' + e.ljust(self._width) + '\n'
+        line = self.status()[:width]
+        text += '\r' + line.ljust(self._width)
+        self._width = len(line)
+        if final:
+            text += '\n'
+        self.out.write(text)
+        self.out.flush()
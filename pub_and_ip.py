@@ -21,8 +21,8 @@
 import os
 import sys
 import socket
-import netmiko
 import getpass
+import switchlist
 
 # We will write all output to this file
 LOG_FILE = "pub_and_ip_output.log"
@@ -127,16 +127,12 @@ def main():
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
-        f.close()
+        # Each switch once, however many times it's in the file
+        switches = switchlist.hosts(sys.argv[1])
         # Get username and password for switches from keyboard
         user, password = user_input()
+        # netmiko takes a while to load, wait until we're about to log in
+        import netmiko
         print()
 
         # File format:
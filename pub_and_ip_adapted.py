@@ -7,6 +7,13 @@
 #
 # Purpose: To extract public dot1x VLAN names from c3750 and c3850 PittNet switches 
 #
+# Usage: ./pub_and_ip_adapted.py <switch file> [--cached] [--per-id]
+#          Switch file rows are <switch>,<vlan id>, a switch can be on several rows.
+#          Each switch's whole VLAN table is read once ('sh vlan brief') and every ID
+#          asked for is looked up in it. The tables are saved to vlan-names-cache.json;
+#          --cached answers from there without logging in when it has every ID.
+#          --per-id goes back to one 'sh vl id <id>' per VLAN.
+#
 # Dependencies: 
 #          Ubuntu and Debian:
 #               build-essential libssl-dev libffi-dev python3-dev python3
@@ -21,11 +28,17 @@
 import os
 import sys
 import socket
-import netmiko
+import json
 import getpass
+import switchlist
 
 # We will write all output to this file
 LOG_FILE = "pub_vlan_names.log"
+# VLAN tables from earlier runs, switch -> {vlan id: name}
+CACHE_FILE = "vlan-names-cache.json"
+CACHE = {}
+# COMMAND THAT GETS THE WHOLE VLAN TABLE
+VLAN_TABLE_CMD = "sh vlan brief"
 
 # Write an entry to our log file
 # Arguments:
@@ -84,6 +97,45 @@ def get_vlans(ssh, vlan_id):
 
     return output[10]
 
+# Pull VLAN ID -> name out of 'sh vlan brief' output
+# Parameters:
+#   result<String> = command output
+#
+# Return:
+#   names<Dict{String: String}> = VLAN ID -> name
+def parse_vlan_table(result):
+    names = {}
+    for line in result.splitlines():
+        fields = line.split()
+        # VLAN rows start with the ID at the very start of the line, port lists
+        # that wrap onto the next line are indented
+        if len(fields) >= 2 and line[:1].isdigit() and fields[0].isdigit():
+            names[fields[0]] = fields[1]
+    return names
+
+# Connect to an edge switch and get its whole VLAN table in one command
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#
+# Return:
+#   names<Dict{String: String}> = VLAN ID -> name
+def get_vlan_names(ssh):
+    return parse_vlan_table(ssh.send_command(VLAN_TABLE_CMD, delay_factor=1))
+
+# Load VLAN tables saved by an earlier run
+def load_cache(path=CACHE_FILE):
+    try:
+        f = open(path)
+        CACHE.update(json.load(f))
+        f.close()
+    except (IOError, ValueError):
+        pass
+
+# Save VLAN tables for the next run
+def save_cache(path=CACHE_FILE):
+    f = open(path, 'w')
+    json.dump(CACHE, f, indent=1, sort_keys=True)
+    f.close()
 
 # Main program logic
 #
@@ -94,22 +146,22 @@ def main():
         print("ERROR: You need to specify the file containing switches")
         write_log("ERROR: You need to specify the file containing switches")
         sys.exit(1)
+    use_cache = '--cached' in sys.argv[2:]
+    per_id = '--per-id' in sys.argv[2:]
+    load_cache()
 
     # Custom welcome message
     print("Welcome! This script will log in to each switch and grab the workstation VLAN IDs")
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
-        f.close()
+        # One job per switch with every VLAN ID the file lists for it,
+        # so a switch that's on several rows is only logged in to once
+        jobs = switchlist.load(sys.argv[1])
         # Get username and password for switches from keyboard
         user, password = user_input()
+        # netmiko takes a while to load, wait until we're about to log in
+        import netmiko
         print()
 
         # File format:
@@ -117,13 +169,17 @@ def main():
         f = open('pub_vlan_names.txt', 'w')
 
         # Go over each switch that was listed in the file
-        for s in switches:
-            s_name = s.split(',')[0]
-            vlan_id = s.split(',')[1]
+        for job in jobs:
+            s_name = job.host
+            vlan_ids = list(dict.fromkeys(p[0] for p in job.params if p and p[0]))
             # Let us know which one we're working with
             print("Current switch " + s_name)
             write_log("Current switch " + s_name)
-            if (check_host(s_name)):
+            # Answer from an earlier run if it has every ID we need
+            names = CACHE.get(s_name) if use_cache else None
+            if names is not None and all(v in names for v in vlan_ids):
+                print("*Using saved VLAN table for " + s_name)
+            elif (check_host(s_name)):
                 try:
                     # Build the ssh object
                     # Here is where we can specify anything specific about the switch
@@ -137,11 +193,13 @@ def main():
                     # Open ssh connection
                     ssh.enable()
 
-                    # Get the VLAN IDs for dot1x and VoIP VLANs and store in arrays
-                    pub_vlan_name = get_vlans(ssh, vlan_id)
-
-                    # Write switch name to file
-                    f.write(s_name + "," + vlan_id + "," + pub_vlan_name + '\n')
+                    if per_id:
+                        # One command per VLAN ID, the old way
+                        names = dict((v, get_vlans(ssh, v)) for v in vlan_ids)
+                    else:
+                        # Whole VLAN table once, every ID comes from it
+                        names = get_vlan_names(ssh)
+                        CACHE[s_name] = names
 
                     # We're done with this switch
 
@@ -152,14 +210,27 @@ def main():
                     print("ERROR: Unexpected exception with " + s_name)
                     write_log("ERROR: Unexpected exception with " + s_name)
                     f.write("ERROR: Unexpected exception with " + s_name + '\n')
+                    continue
 
             # Hostname didn't resolve
             else:
                 print("ERROR: Check hostname for " + s_name)
                 write_log("ERROR: Check hostname for " + s_name)
                 f.write("ERROR: Check hostname for " + s_name + '\n')
+                continue
+
+            # Look up the name of every VLAN ID listed for this switch
+            for vlan_id in vlan_ids:
+                if vlan_id not in names:
+                    print("ERROR: No VLAN " + vlan_id + " on " + s_name)
+                    write_log("ERROR: No VLAN " + vlan_id + " on " + s_name)
+                    f.write("ERROR: No VLAN " + vlan_id + " on " + s_name + '\n')
+                    continue
+                # Write switch name to file
+                f.write(s_name + "," + vlan_id + "," + names[vlan_id] + '\n')
         print()
         f.close()
+        save_cache()
         # No switches are left in the list, we're done
         print("Done with all switches.")
         write_log("Done with all switches.")
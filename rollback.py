@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+# Title: rollback.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Undo a template push. The lines a switch was actually sent ('config' in
+#          the run archive, saved by fourpete.py and plan.py apply) are undone using
+#          what each port had before the push, then the rollback goes to all the
+#          affected switches at once. Per-building / per-AAA caps from scheduler.py
+#          keep one site from getting hammered while the rest of the fleet rolls back.
+#
+#          What a port had before comes from 'before-full' (every interface's whole
+#          config, plan.py apply) or else fourpete.py's filtered -before snapshot.
+#          The filtered one only shows the lines confparse.PORT_FILTER keeps, so a
+#          sent line it can't show (source template, power inline, QoS, ...) is left
+#          alone instead of guessed at, and counted as skipped.
+#
+#          Usage: ./rollback.py [-q] <switch file> [grouping rules]
+#               grouping rules are the same as fiveguys.py, e.g. bldg=column:1 or
+#               bldg=group for a file with [group] lines
+#               -q for just the summary instead of the live status line
+#
+# Dependencies:
+#          Netmiko python3 module
+
+# Import statements
+import re
+import sys
+import json
+import getpass
+import fleet
+import progress
+import plan
+import probe
+import scheduler
+import confparse
+import runarchive
+import switchlist
+
+# Where the computed rollback is saved before it's pushed
+ROLLBACK_FILE = 'rollback-plan.json'
+# Most switches rolling back at once per group, and logins per second per group
+GROUP_CAP = 8
+GROUP_LOGIN_RATE = 2.0
+# Pushed lines that replace whatever value the port had for the same setting
+SETTINGS = (
+        'power inline',
+        'switchport port-security maximum',
+        'srr-queue bandwidth share',
+        'source template')
+
+# Work out the command that undoes one pushed line
+# Parameters:
+#   c<String> = line that was pushed
+#   before<Array[String]> = port's config lines before the push
+#
+# Return:
+#   undo<String> = command that puts it back, None if nothing needs undoing
+def undo_command(c, before):
+    # Negated command: turn it back on
+    if c.startswith('no '):
+        return c[3:]
+    # If the port had its own setting for this before, put that back
+    # e.g. 'power inline never' or 'switchport port-security maximum 3'
+    key = c
+    for prefix in SETTINGS:
+        if c.startswith(prefix):
+            key = prefix
+    for line in before:
+        if line != c and line.startswith(key):
+            return line
+    # 'power inline auto' is the default, nothing to undo
+    if c == 'power inline auto':
+        return None
+    # srr-queue settings are removed without the numbers
+    if c.startswith('srr-queue bandwidth share'):
+        return 'no srr-queue bandwidth share'
+    return 'no ' + c
+
+# What each port had before the push
+# Parameters:
+#   switch<String> = switch hostname
+#   root<String> = directory the run archive is in
+#
+# Return:
+#   before<Dict{String: Array[String]}> = long port name -> config lines, None if
+#       there's no snapshot
+#   full<Boolean> = True if those are whole interface configs
+def load_before(switch, root='.'):
+    text = runarchive.read(switch, 'before-full', root)
+    if text is not None:
+        return dict((name, [l.strip() for l in block[1:] if l.strip()])
+                for name, block in confparse.interfaces(text).items()), True
+    # run-archive.db, or <switch>/<switch>-before.txt from older runs
+    text = runarchive.read(switch, 'before', root)
+    if text is None:
+        return None, False
+    before = {}
+    for p in plan.split_ports(text):
+        lines = [l.strip() for l in p.split('\n')]
+        before[confparse.long_port_name(lines[0].split(None, 1)[1])] = [l for l in lines[1:] if l]
+    return before, False
+
+# Work out the rollback for one port
+# Parameters:
+#   sent<Array[String]> = 'interface X' and the lines that were sent to it
+#   before<Array[String]> = the port's config lines before the push, None if unknown
+#   full<Boolean> = before is the whole interface config, not the filtered snapshot
+#
+# Return:
+#   commands<Array[String]> = 'interface X' followed by the undo lines, None if
+#       there's nothing to undo
+#   skipped<Int> = sent lines left alone because their state before isn't known
+def port_rollback(sent, before, full):
+    undo = []
+    skipped = 0
+    # Undo in reverse order, template goes last in so it comes off first
+    for c in reversed(sent[1:]):
+        if before is None or not (full or re.search(confparse.PORT_FILTER, c)):
+            skipped += 1
+            continue
+        u = undo_command(c, before)
+        if u is not None and u not in undo:
+            undo.append(u)
+    if not undo:
+        return None, skipped
+    return [sent[0]] + undo, skipped
+
+# Work out the rollback for every switch that was sent something
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   root<String> = directory the run archive is in
+#
+# Return:
+#   rollback<Dict{String: Array[Array[String]]}> = switch -> undo block per port
+#   missing<Array[String]> = switches with no record of anything sent
+#   skipped<Dict{String: Int}> = switch -> sent lines that can't be undone safely
+def make_rollback(switches, root='.'):
+    rollback = {}
+    missing = []
+    skipped = {}
+    for s in switches:
+        text = runarchive.read(s, 'config', root)
+        sent = plan.split_ports(text) if text else []
+        if not sent:
+            missing.append(s)
+            continue
+        before, full = load_before(s, root)
+        blocks = []
+        for p in sent:
+            lines = [l.strip() for l in p.split('\n') if l.strip()]
+            port = confparse.long_port_name(lines[0].split(None, 1)[1])
+            commands, unknown = port_rollback(lines, before.get(port) if before is not None else None, full)
+            if unknown:
+                skipped[s] = skipped.get(s, 0) + unknown
+            if commands:
+                blocks.append(commands)
+        if blocks:
+            rollback[s] = blocks
+    return rollback, missing, skipped
+
+# Push the rollback to every affected switch concurrently
+# Parameters:
+#   rollback<Dict{String: Array[Array[String]]}> = from make_rollback()
+#   user<String> = username
+#   password<String> = password
+#   sched<GroupScheduler> = per-group caps, None for none
+#   progress<Progress> = progress.py status line, fleet.py's default if not given
+#
+# Return:
+#   results<Dict{String: (String, Object)}> = from fleet.run_fleet()
+def push_rollback(rollback, user, password, sched=None, progress=print):
+    import netmiko
+
+    def job(s, timed):
+        commands = [c for block in rollback[s] for c in block]
+        with timed('connect'):
+            ssh = netmiko.ConnectHandler(
+                    device_type = 'cisco_ios',
+                    ip = s,
+                    username = user,
+                    password = password)
+            ssh.enable()
+        try:
+            # Every port on the switch goes in one config session
+            with timed('command'):
+                output = ssh.send_config_set(commands)
+        finally:
+            ssh.disconnect()
+
+        runarchive.write(s, 'rollback', output)
+        return len(rollback[s])
+
+    return fleet.run_fleet(list(rollback), job, progress=progress, scheduler=sched)
+
+# Main program logic
+#
+def main():
+    tracker = progress.Progress.from_argv()
+    if len(sys.argv) == 1:
+        print("!ERROR: You need to specify the file containing switches")
+        sys.exit(1)
+
+    jobs = switchlist.load(sys.argv[1])
+    rows = [j.row for j in jobs]
+
+    rollback, missing, skipped = make_rollback([r[0] for r in rows])
+    for s in missing:
+        print("!Nothing recorded as sent to " + s + ", nothing to roll back")
+    for s, count in skipped.items():
+        print("!%d lines sent to %s left as they are, what they replaced wasn't recorded" % (count, s))
+    f = open(ROLLBACK_FILE, 'w')
+    json.dump(rollback, f, indent=1)
+    f.close()
+    print("*Rollback for %d switches (%d ports) written to %s" %
+            (len(rollback), sum(len(b) for b in rollback.values()), ROLLBACK_FILE))
+    if not rollback:
+        print("Nothing to roll back.")
+        return
+
+    go = input("Push the rollback now? (y/N): ").lower()
+    if go != 'y':
+        print("!ERROR: User canceled")
+        sys.exit(1)
+    try:
+        user = input("Enter username: ")
+        password = getpass.getpass("Enter password: ")
+    except KeyboardInterrupt:
+        print()
+        print("!ERROR: Caught KeyboardInterrupt, exiting")
+        sys.exit(1)
+
+    live = set(probe.split_reachable(list(rollback)))
+    rollback = dict((s, b) for s, b in rollback.items() if s in live)
+
+    sched = None
+    if len(sys.argv) > 2:
+        sched = scheduler.GroupScheduler([r for r in rows if r[0] in rollback],
+                scheduler.make_grouper(sys.argv[2:]),
+                cap=GROUP_CAP, rate=GROUP_LOGIN_RATE, burst=GROUP_CAP,
+                listed=dict((j.host, j.group) for j in jobs))
+
+    results = push_rollback(rollback, user, password, sched, tracker)
+    failed = [s for s, (status, _) in results.items() if status != 'ok']
+    for s in failed:
+        print("!ERROR: " + s + ": " + str(results[s][1]))
+    print("Done with all switches. %d rolled back, %d failed" % (len(results) - len(failed), len(failed)))
+    print("Exiting")
+
+# Execute the program
+if __name__ == "__main__":
+    main()
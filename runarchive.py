@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+# Title: runarchive.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Keep every per-switch output file (-vlans, -ports, -before, -before-full,
+#          -config, -config-output, -verify, -after, -rollback) in one SQLite file
+#          instead of a directory and half a dozen small files per switch. Writes are
+#          buffered and go in a few hundred at a time in one transaction, nothing is
+#          ever overwritten (a newer copy is just added and wins), and the table is
+#          indexed by switch and name.
+#          'extract' writes the old <switch>/<switch>-<name>.txt layout back out.
+#
+#          Usage:
+#               ./runarchive.py list [switch]              what's in the archive
+#               ./runarchive.py show <switch> [name ...]   print a switch's files
+#               ./runarchive.py extract [dir] [switch ...] old layout under dir (default .)
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import os
+import sys
+import time
+import zlib
+import atexit
+import sqlite3
+import threading
+
+# The archive, next to where the per-switch directories used to go
+ARCHIVE_FILE = 'run-archive.db'
+# Buffered writes go in once there are this many
+FLUSH_EVERY = 256
+
+# One archive file
+# Safe to share between fleet.py's worker threads
+# Parameters:
+#   path<String> = SQLite file, created if it isn't there
+#   flush_every<Int> = buffered writes to hold before they go to disk
+class Archive:
+    def __init__(self, path=ARCHIVE_FILE, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.pending = []
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS artifacts ('
+                'id INTEGER PRIMARY KEY, switch TEXT NOT NULL, name TEXT NOT NULL, '
+                'time REAL NOT NULL, data BLOB NOT NULL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS artifacts_switch ON artifacts (switch, name)')
+        self.db.commit()
+
+    # Add one file for a switch
+    # Parameters:
+    #   switch<String> = switch hostname
+    #   name<String> = what it is, e.g. 'before' for the old <switch>-before.txt
+    #   text<String> = contents
+    def put(self, switch, name, text):
+        row = (switch, name, time.time(), zlib.compress(text.encode('utf-8', errors='replace')))
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        with self.db:
+            self.db.executemany('INSERT INTO artifacts (switch, name, time, data) VALUES (?, ?, ?, ?)',
+                    self.pending)
+        self.pending = []
+
+    # Write out anything still buffered
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    # Newest copy of one file
+    # Return:
+    #   text<String> = contents, None if the archive doesn't have it
+    def get(self, switch, name):
+        with self.lock:
+            self._flush()
+            row = self.db.execute('SELECT data FROM artifacts WHERE switch = ? AND name = ? '
+                    'ORDER BY id DESC LIMIT 1', (switch, name)).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    # What's in the archive
+    # Parameters:
+    #   switch<String> = only this switch, None for all
+    #
+    # Return:
+    #   entries<Array[(String, String, Int)]> = (switch, name, copies), sorted
+    def entries(self, switch=None):
+        with self.lock:
+            self._flush()
+            if switch is None:
+                rows = self.db.execute('SELECT switch, name, COUNT(*) FROM artifacts '
+                        'GROUP BY switch, name ORDER BY switch, name').fetchall()
+            else:
+                rows = self.db.execute('SELECT switch, name, COUNT(*) FROM artifacts WHERE switch = ? '
+                        'GROUP BY switch, name ORDER BY switch, name', (switch,)).fetchall()
+        return rows
+
+    # Write the newest copy of every file back out in the old layout
+    # Parameters:
+    #   root<String> = directory the per-switch directories go under
+    #   switches<Array[String]> = only these switches, None for all
+    #
+    # Return:
+    #   count<Int> = files written
+    def extract(self, root='.', switches=None):
+        count = 0
+        wanted = set(switches) if switches else None
+        for switch, name, _ in self.entries():
+            if wanted is not None and switch not in wanted:
+                continue
+            path = os.path.join(root, switch)
+            os.makedirs(path, exist_ok=True)
+            f = open(os.path.join(path, switch + '-' + name + '.txt'), 'w')
+            f.write(self.get(switch, name))
+            f.close()
+            count += 1
+        return count
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.db.close()
+
+# Archives opened through open_archive(), path -> Archive
+_open = {}
+_open_lock = threading.Lock()
+
+# Get the shared Archive for a file, flushed and closed when the program exits
+def open_archive(path=ARCHIVE_FILE):
+    path = os.path.abspath(path)
+    with _open_lock:
+        if path not in _open:
+            _open[path] = Archive(path)
+            atexit.register(_open[path].close)
+        return _open[path]
+
+# Save a per-switch file to the run archive
+# Parameters:
+#   switch<String> = switch hostname
+#   name<String> = 'vlans', 'ports', 'before', 'config', 'verify', 'after', 'rollback', ...
+#   text<String> = contents
+def write(switch, name, text):
+    open_archive().put(switch, name, text)
+
+# Push buffered writes to disk, e.g. before asking the user to look at them
+def flush():
+    open_archive().flush()
+
+# Read a per-switch file from the archive, or from the old layout if the archive
+# doesn't have it (runs from before the archive)
+# Parameters:
+#   switch<String> = switch hostname
+#   name<String> = e.g. 'before'
+#   root<String> = directory the archive and per-switch directories are in
+#
+# Return:
+#   text<String> = contents, None if it's in neither place
+def read(switch, name, root='.'):
+    path = os.path.join(root, ARCHIVE_FILE)
+    if os.path.exists(path):
+        text = open_archive(path).get(switch, name)
+        if text is not None:
+            return text
+    path = os.path.join(root, switch, switch + '-' + name + '.txt')
+    if os.path.exists(path):
+        f = open(path)
+        text = f.read()
+        f.close()
+        return text
+    return None
+
+# Every switch that has a given file, in the archive or the old layout
+def switches_with(name, root='.'):
+    found = set()
+    path = os.path.join(root, ARCHIVE_FILE)
+    if os.path.exists(path):
+        found.update(s for s, n, _ in open_archive(path).entries() if n == name)
+    for s in os.listdir(root):
+        if os.path.exists(os.path.join(root, s, s + '-' + name + '.txt')):
+            found.add(s)
+    return sorted(found)
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('list', 'show', 'extract') or \
+            (sys.argv[1] == 'show' and len(sys.argv) < 3):
+        print("!ERROR: usage: runarchive.py list [switch]")
+        print("               runarchive.py show <switch> [name ...]")
+        print("               runarchive.py extract [dir] [switch ...]")
+        sys.exit(1)
+    if not os.path.exists(ARCHIVE_FILE):
+        print("!ERROR: No " + ARCHIVE_FILE + " here")
+        sys.exit(1)
+    archive = open_archive()
+
+    if sys.argv[1] == 'list':
+        entries = archive.entries(sys.argv[2] if len(sys.argv) > 2 else None)
+        for switch, name, copies in entries:
+            print(switch + '-' + name + ('  (%d copies)' % copies if copies > 1 else ''))
+        print("-%d files for %d switches" % (len(entries), len(set(e[0] for e in entries))))
+    elif sys.argv[1] == 'show':
+        switch = sys.argv[2]
+        names = sys.argv[3:] or [n for _, n, _ in archive.entries(switch)]
+        if not names:
+            print("!Nothing for " + switch + " in the archive")
+        for name in names:
+            text = archive.get(switch, name)
+            print("===== " + switch + "-" + name + " =====")
+            print(text if text is not None else "!Not in the archive")
+    else:
+        root = sys.argv[2] if len(sys.argv) > 2 else '.'
+        count = archive.extract(root, sys.argv[3:])
+        print("*%d files written under %s" % (count, root))
+
+# Execute the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# Title: scheduler.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Decide which switch fleet.py logs in to next so no single building,
+#          distribution block or AAA server gets hammered. Each switch belongs to one
+#          or more groups, each group has a cap on switches in flight and a token
+#          bucket on login rate. Switches from quiet groups jump ahead of ones from
+#          busy groups, so the fleet keeps moving while each site stays under its caps.
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import re
+import time
+import threading
+import collections
+
+# Token bucket for logins per second
+# Parameters:
+#   rate<Float> = tokens added per second (None means unlimited)
+#   burst<Int> = most tokens the bucket can hold
+class TokenBucket:
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    # Seconds until a token is available, 0 if one is available now
+    def wait_time(self, now):
+        if not self.rate:
+            return 0
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        if self.rate:
+            self._refill(now)
+            self.tokens -= 1
+
+# Build a function that maps a switch line to its group keys
+# Parameters:
+#   rules<Array[String]> = grouping rules, each one of:
+#       column:N     -- the Nth comma separated column of the switch file (0 is the host)
+#       group        -- the [group] the host is listed under in the switch file
+#       prefix:N     -- the first N dash separated fields of the hostname
+#       regex:PATTERN -- first capture group (or whole match) of PATTERN on the hostname
+#       Prefix a rule with NAME= to name the group, e.g. aaa=column:2
+#
+# Return:
+#   grouper<Function> = grouper(row, group) -> Tuple of group keys, row is the list of
+#       columns and group is switchlist.py's Job.group
+def make_grouper(rules):
+    compiled = []
+    for n, rule in enumerate(rules):
+        name = 'g' + str(n)
+        if '=' in rule.split(':', 1)[0]:
+            name, rule = rule.split('=', 1)
+        kind, _, arg = rule.partition(':')
+        if kind == 'column':
+            compiled.append((name, kind, int(arg)))
+        elif kind == 'prefix':
+            compiled.append((name, kind, int(arg)))
+        elif kind == 'regex':
+            compiled.append((name, kind, re.compile(arg)))
+        elif kind == 'group':
+            compiled.append((name, kind, None))
+        else:
+            raise ValueError("Unknown grouping rule: " + rule)
+
+    def grouper(row, group=None):
+        host = row[0]
+        keys = []
+        for name, kind, arg in compiled:
+            key = None
+            if kind == 'column':
+                if arg < len(row) and row[arg]:
+                    key = row[arg]
+            elif kind == 'group':
+                key = group
+            elif kind == 'prefix':
+                key = '-'.join(host.split('-')[:arg])
+            else:
+                m = arg.search(host)
+                if m:
+                    key = m.group(1) if m.groups() else m.group(0)
+            if key:
+                keys.append(name + ':' + key)
+        return tuple(keys)
+
+    return grouper
+
+# Hands out switches in an order that respects per-group caps and login rates
+# Parameters:
+#   rows<Array[Array[String]]> = switch file rows, column 0 is the host
+#   grouper<Function> = from make_grouper(), None puts every switch in no group
+#   cap<Int> = most switches in flight per group (None for no cap)
+#   rate<Float> = logins per second per group (None for no limit)
+#   burst<Int> = logins a quiet group may do back to back
+#   limits<Dict{String: (cap, rate, burst)}> = per-group overrides
+#   listed<Dict{String: String}> = host -> [group] it's under in the switch file, for
+#       the 'group' rule
+class GroupScheduler:
+    def __init__(self, rows, grouper=None, cap=None, rate=None, burst=1, limits=None, listed=None):
+        self.cap = cap
+        self.rate = rate
+        self.burst = burst
+        self.limits = limits or {}
+        # Pending switches are queued per distinct set of groups, so picking the next
+        # one only looks at each set once no matter how many switches are waiting
+        self.pending = collections.OrderedDict()
+        self.groups = {}
+        self.in_flight = {}
+        self.buckets = {}
+        for row in rows:
+            keys = grouper(row, (listed or {}).get(row[0])) if grouper else ()
+            self.groups[row[0]] = keys
+            self.pending.setdefault(keys, collections.deque()).append(row[0])
+            for k in keys:
+                if k not in self.buckets:
+                    c, r, b = self.limits.get(k, (cap, rate, burst))
+                    self.buckets[k] = TokenBucket(r, b)
+                    self.in_flight[k] = 0
+        self._cond = threading.Condition()
+
+    def _cap(self, key):
+        return self.limits.get(key, (self.cap, self.rate, self.burst))[0]
+
+    # How long until a switch in these groups could start, 0 if now, None if capped
+    def _ready_in(self, keys, now):
+        wait = 0
+        for k in keys:
+            cap = self._cap(k)
+            if cap is not None and self.in_flight[k] >= cap:
+                return None
+            wait = max(wait, self.buckets[k].wait_time(now))
+        return wait
+
+    # Block until some pending switch may start and hand it out
+    # Return:
+    #   host<String> = next switch, None when every switch has been handed out
+    def take(self):
+        with self._cond:
+            while self.pending:
+                now = time.monotonic()
+                soonest = None
+                for keys in self.pending:
+                    wait = self._ready_in(keys, now)
+                    if wait == 0:
+                        queue = self.pending.pop(keys)
+                        host = queue.popleft()
+                        # Round robin: this set of groups goes to the back of the line
+                        if queue:
+                            self.pending[keys] = queue
+                        for k in keys:
+                            self.in_flight[k] += 1
+                            self.buckets[k].take(now)
+                        return host
+                    if wait is not None and (soonest is None or wait < soonest):
+                        soonest = wait
+                # Nothing ready, sleep until a token shows up or a switch finishes
+                self._cond.wait(soonest)
+            return None
+
+    # Mark a switch finished so its groups free up a slot
+    def done(self, host):
+        with self._cond:
+            for k in self.groups[host]:
+                self.in_flight[k] -= 1
+            self._cond.notify_all()
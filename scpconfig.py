@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+# Title: scpconfig.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Pull each switch's whole running config as a file over SCP, instead of
+#          scraping 'show running-config' off the interactive shell, then answer the
+#          template, interface and VOIP questions from the local copy (confparse.py).
+#          The switch needs 'ip scp server enable'.
+#
+#          Usage:
+#               ./scpconfig.py collect [-q] [-p N] <switch file>
+#                   saves configs/<switch>-running-config.txt for every switch and
+#                   writes switch_template_check.txt and yes-voip.txt / no-voip.txt,
+#                   -q for just the summary instead of the live status line,
+#                   -p N to spread the logins and parsing over N processes (fleet.py)
+#               ./scpconfig.py bench <host> [runs] [port]
+#                   times the CLI path against the SCP path on one switch or simulator
+#               ./scpconfig.py scale <host> [pulls] [max processes] [port]
+#                   pulls the config from one switch or simulator over and over with
+#                   1, 2, 4 ... processes and prints how throughput scales
+#
+# Dependencies:
+#          Paramiko python3 module (comes with netmiko)
+#          Netmiko python3 module for the benchmark
+
+# Import statements
+import os
+import sys
+import time
+import getpass
+import fleet
+import progress
+import probe
+import switchlist
+import fastexec
+import confparse
+import compliance
+
+# Where the pulled configs go
+CONFIG_DIR = 'configs'
+# File on the switch to copy
+REMOTE_FILE = 'system:running-config'
+
+# Read exactly n bytes from a channel
+def _recv_exact(chan, n):
+    data = []
+    while n > 0:
+        chunk = chan.recv(min(n, 65536))
+        if not chunk:
+            raise EOFError("SCP channel closed early")
+        data.append(chunk)
+        n -= len(chunk)
+    return b''.join(data)
+
+# Read one SCP control line
+def _recv_line(chan):
+    line = b''
+    while not line.endswith(b'\n'):
+        c = chan.recv(1)
+        if not c:
+            raise EOFError("SCP channel closed early")
+        line += c
+    return line
+
+# Copy one file off the switch over SCP (we're the receiving end of 'scp -f')
+# Parameters:
+#   transport<paramiko.Transport> = authenticated SSH transport
+#   remote<String> = file on the switch
+#   timeout<Float> = seconds for each read
+#
+# Return:
+#   data<Bytes> = file contents
+def scp_pull(transport, remote=REMOTE_FILE, timeout=60):
+    chan = transport.open_session(timeout=timeout)
+    try:
+        chan.settimeout(timeout)
+        chan.exec_command('scp -f ' + remote)
+        chan.sendall(b'\0')
+        while True:
+            line = _recv_line(chan)
+            # 'T' lines carry file times, we don't care
+            if line.startswith(b'T'):
+                chan.sendall(b'\0')
+                continue
+            if line[:1] in (b'\x01', b'\x02'):
+                raise IOError("SCP error: " + line[1:].decode(errors='replace').strip())
+            if not line.startswith(b'C'):
+                raise IOError("Unexpected SCP reply: " + line.decode(errors='replace').strip())
+            break
+        # C<mode> <size> <name>
+        size = int(line.split()[1])
+        chan.sendall(b'\0')
+        data = _recv_exact(chan, size)
+        # Sender ends the file with a status byte
+        _recv_exact(chan, 1)
+        chan.sendall(b'\0')
+        return data
+    finally:
+        chan.close()
+
+# Save a config under CONFIG_DIR
+# Return:
+#   path<String> = where it went
+def save_config(switch, text, outdir=CONFIG_DIR):
+    if not os.path.exists(outdir):
+        os.makedirs(outdir, exist_ok=True)
+    path = os.path.join(outdir, switch + '-running-config.txt')
+    f = open(path, 'w')
+    f.write(text)
+    f.close()
+    return path
+
+# Answer the usual questions from a config on disk instead of the switch
+# Parameters:
+#   config<String> = running config text
+#   ports<Array[String]> = access ports to pull interface config for
+#
+# Return:
+#   result<Dict> =
+#       template -- same one line answer get_template() gives
+#       voip -- first line mentioning VOIP, empty if none (check_voip())
+#       ports -- port -> 'sh run int' style config (get_running_config())
+def analyze(config, ports=()):
+    template = compliance.yes_no(compliance.check_config(config, compliance.VOIP_RULES))
+    voip = confparse.include(config, 'VOIP').split('\n')[0]
+    ifaces = confparse.interfaces(config)
+    return {
+        'template': template,
+        'voip': voip,
+        'ports': dict((p, confparse.interface_config(ifaces, p)) for p in ports),
+    }
+
+# Build the job fleet.py runs on each switch: pull its running config over SCP
+# Parameters:
+#   user<String> = username
+#   password<String> = password
+#   port<Int> = SSH port
+#   analyzed<Boolean> = also run analyze() in the job, so it happens in whichever
+#                       process pulled the config
+#   host<String> = log in here whatever the switch is called, for scale()
+#
+# Return:
+#   job<Function> = job(switch, timed) -> config text, or (config text, analyze()
+#                   result) if analyzed
+def make_job(user, password, port=22, analyzed=False, host=None):
+    pool = fastexec.ExecTransport(user, password, port=port)
+
+    def job(s, timed):
+        # Every job to the same host gets its own login, like separate switches would
+        target = host or s
+        conn = fastexec.ExecTransport(user, password, port=port) if host else pool
+        with timed('connect'):
+            transport = conn.transport(target)
+        try:
+            with timed('command'):
+                text = scp_pull(transport).decode('utf-8', errors='replace')
+        finally:
+            conn.close(target)
+        if analyzed:
+            return text, analyze(text)
+        return text
+
+    return job
+
+# Pull configs from a list of switches and write the usual report files
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   user<String> = username
+#   password<String> = password
+#   progress<Progress> = progress.py status line, fleet.py's default if not given
+#   processes<Int> = spread the switches over this many processes, None for just threads
+def collect(switches, user, password, progress=print, processes=None):
+    if processes:
+        # This process saves each config as it comes back, the others pull and parse
+        def save(s, status, value):
+            if status == 'ok':
+                save_config(s, value[0])
+
+        results = fleet.run_processes(switches, make_job, (user, password, 22, True),
+                processes, progress, on_result=save)
+        write_reports(dict((s, (status, value[1] if status == 'ok' else value))
+                for s, (status, value) in results.items()))
+        return
+
+    pull = make_job(user, password)
+
+    def job(s, timed):
+        text = pull(s, timed)
+        save_config(s, text)
+        return analyze(text)
+
+    write_reports(fleet.run_fleet(switches, job, progress=progress))
+
+# Write the usual report files from analyze() results
+# Parameters:
+#   results<Dict{String: (String, Object)}> = switch -> (status, analyze() result or error)
+def write_reports(results):
+    sw_tmp = open('switch_template_check.txt', 'w')
+    yes = open('yes-voip.txt', 'w')
+    no = open('no-voip.txt', 'w')
+    for s, (status, result) in results.items():
+        if status != 'ok':
+            print("!ERROR: " + s + ": " + str(result))
+            continue
+        sw_tmp.write(s + ": " + result['template'] + '\n')
+        if result['voip']:
+            yes.write(s + '\n')
+        else:
+            no.write(s + '\n')
+    sw_tmp.close()
+    yes.close()
+    no.close()
+
+# Time the CLI path against the SCP path on one switch
+def bench(host, user, password, runs=5, port=22):
+    import netmiko
+    ssh = netmiko.ConnectHandler(device_type='cisco_ios', ip=host, port=port,
+            username=user, password=password)
+    ssh.enable()
+    pool = fastexec.ExecTransport(user, password, port=port)
+    transport = pool.transport(host)
+
+    def cli():
+        config = ssh.send_command('show running-config', delay_factor=2)
+        return analyze(config)
+
+    def scp():
+        return analyze(scp_pull(transport).decode('utf-8', errors='replace'))
+
+    size = len(scp_pull(transport))
+    results = [('CLI show running-config', fastexec.time_runs(cli, runs)),
+            ('SCP ' + REMOTE_FILE, fastexec.time_runs(scp, runs))]
+    ssh.disconnect()
+    pool.close()
+
+    print()
+    print("%d runs on %s:%d, config is %d bytes" % (runs, host, port, size))
+    base = results[0][1][runs // 2]
+    for name, times in results:
+        median = times[runs // 2]
+        print("  %-28s median %7.1f ms  %6.1f KB/s  %.1fx" %
+                (name, median * 1000, size / 1024.0 / max(median, 1e-9), base / max(median, 1e-9)))
+
+# Pull one switch's config over and over with more and more processes, to see how
+# far past one core the sweep scales
+# Parameters:
+#   host<String> = switch or simulator
+#   user<String> = username
+#   password<String> = password
+#   pulls<Int> = pulls per round, each one a fresh login
+#   most<Int> = most processes to try
+#   port<Int> = SSH port
+def scale(host, user, password, pulls=200, most=None, port=22):
+    most = most or os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < most:
+        counts.append(n)
+        n *= 2
+    counts.append(most)
+
+    print()
+    print("%d pulls from %s:%d per round, %d cores" % (pulls, host, port, os.cpu_count() or 1))
+    base = None
+    for n in counts:
+        switches = ["%s#%d" % (host, i) for i in range(pulls)]
+        start = time.monotonic()
+        results = fleet.run_processes(switches, make_job, (user, password, port, True, host),
+                processes=n, progress=None)
+        took = time.monotonic() - start
+        failed = sum(1 for status, _ in results.values() if status != 'ok')
+        rate = (pulls - failed) / took
+        base = base or rate
+        print("  %2d processes  %6.1f s  %7.1f switches/s  %5.2fx  %d failed" %
+                (n, took, rate, rate / base if base else 0.0, failed))
+
+# Main program logic
+#
+def main():
+    tracker = progress.Progress.from_argv()
+    processes = None
+    if '-p' in sys.argv[2:-1]:
+        i = sys.argv.index('-p', 2)
+        processes = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+    if len(sys.argv) < 3 or sys.argv[1] not in ('collect', 'bench', 'scale') or \
+            (processes is not None and not processes.isdigit()):
+        print("!ERROR: usage: scpconfig.py collect [-q] [-p N] <switch file>")
+        print("               scpconfig.py bench <host> [runs] [port]")
+        print("               scpconfig.py scale <host> [pulls] [max processes] [port]")
+        sys.exit(1)
+
+    try:
+        user = input("Enter username: ")
+        password = getpass.getpass("Enter password: ")
+    except KeyboardInterrupt:
+        print()
+        print("!ERROR: Caught KeyboardInterrupt, exiting")
+        sys.exit(1)
+
+    if sys.argv[1] == 'bench':
+        runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+        port = int(sys.argv[4]) if len(sys.argv) > 4 else 22
+        bench(sys.argv[2], user, password, runs, port)
+        return
+
+    if sys.argv[1] == 'scale':
+        pulls = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+        most = int(sys.argv[4]) if len(sys.argv) > 4 else None
+        port = int(sys.argv[5]) if len(sys.argv) > 5 else 22
+        scale(sys.argv[2], user, password, pulls, most, port)
+        return
+
+    switches = switchlist.hosts(sys.argv[2])
+
+    collect(probe.split_reachable(switches), user, password, tracker,
+            int(processes) if processes else None)
+    print("Done with all switches.")
+    print("Exiting")
+
+# Execute the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+
+# Title: shard.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Spread one sweep over several jump hosts when one of them runs out of CPU
+#          for SSH or file descriptors. A coordinator holds the switch list and hands
+#          it out in shards to workers, each worker runs its shard through fleet.py
+#          (threads, AIMD limit, its own credentials) and sends every switch's result
+#          back as soon as it has it. The coordinator writes the usual output files
+#          once every switch has an answer.
+#
+#          Rebalancing:
+#               a worker with nothing left to do takes half of the not yet started
+#                   switches from the worker that looks furthest from done
+#               a worker that disconnects, or says nothing for DEAD_AFTER seconds,
+#                   loses its unfinished switches back to the queue
+#          A switch's first answer wins, so a worker that comes back late can't
+#          double count anything.
+#
+#          Protocol: one TCP connection per worker, one JSON object per line, 'op' says
+#          what it is. Worker -> coordinator: hello (token, name), ready, result
+#          (switch, status, value), dropped (id, switches), beat. Coordinator -> worker:
+#          welcome (task), shard (id, switches), drop (id, switches), done, error
+#          (reason). drop and dropped carry the shard id, so an answer that shows up
+#          after the worker has moved on to its next shard is ignored.
+#          The token only keeps strays out, run it on a network you trust. Switch
+#          credentials never leave the worker, each one asks for its own.
+#
+#          Usage:
+#               ./shard.py coordinator <task> <switch file> [--port N] [--shard N] [-q]
+#                   tasks: probe, vlans, collect. Prints the token workers need
+#               ./shard.py worker <coordinator host>[:port] [--name NAME] [--limit N]
+#                   token from $KAL_SHARD_TOKEN or asked for, --limit caps the
+#                   switches this worker has in flight
+#          e.g. on one machine:
+#               KAL_SHARD_TOKEN=x ./shard.py coordinator probe switches.txt &
+#               KAL_SHARD_TOKEN=x ./shard.py worker localhost &
+#               KAL_SHARD_TOKEN=x ./shard.py worker localhost
+#
+# Dependencies:
+#          None outside the standard library, plus whatever the task needs on the
+#          workers (netmiko for vlans, paramiko for collect)
+
+# Import statements
+import os
+import sys
+import hmac
+import json
+import time
+import queue
+import socket
+import getpass
+import secrets
+import threading
+import collections
+import fleet
+import probe
+import progress
+import fiveguys
+import scpconfig
+import switchlist
+
+# Where the coordinator listens
+PORT = 5117
+# Switches per shard
+SHARD_SIZE = 50
+# Seconds between a worker's heartbeats
+HEARTBEAT = 5
+# Seconds of silence before a busy worker is taken for dead
+DEAD_AFTER = 30
+# Environment variable with the shared token
+TOKEN_ENV = 'KAL_SHARD_TOKEN'
+
+# What a sweep does, on the workers and then on the coordinator
+#   login -- the worker needs a username and password
+#   make -- make(user, password) -> job(switch, timed) for fleet.py, result has to fit in JSON
+#   merge -- merge(results) writes the usual output files on the coordinator
+Task = collections.namedtuple('Task', 'login make merge about')
+
+def _probe_job(user, password):
+    def job(s, timed):
+        with timed('connect'):
+            _, dead = probe.probe([s])
+        if dead:
+            raise ConnectionError(dead[s])
+        return True
+    return job
+
+def _probe_merge(results):
+    dead = [(s, value) for s, (status, value) in results.items() if status != 'ok']
+    f = open(probe.REPORT_FILE, 'w')
+    for s, reason in dead:
+        f.write(s + ": " + str(reason) + '\n')
+    f.close()
+    print("*%d up, %d unreachable, written to %s" % (len(results) - len(dead), len(dead), probe.REPORT_FILE))
+
+def _collect_merge(results):
+    analyzed = {}
+    for s, (status, value) in results.items():
+        if status == 'ok':
+            scpconfig.save_config(s, value)
+            value = scpconfig.analyze(value)
+        analyzed[s] = (status, value)
+    scpconfig.write_reports(analyzed)
+
+TASKS = {
+        'probe': Task(False, _probe_job, _probe_merge, 'port 22 check -> unreachable.txt'),
+        'vlans': Task(True, fiveguys.make_job, fiveguys.write_vlans, 'workstation VLANs -> workstation-vlans.txt'),
+        'collect': Task(True, scpconfig.make_job, _collect_merge, 'running configs over SCP -> configs/ and reports')}
+
+# One end of a connection, JSON lines both ways
+# send() can be called from any thread, recv() from one
+class Channel:
+    def __init__(self, conn):
+        self.conn = conn
+        self.reader = conn.makefile('r', encoding='utf-8', newline='\n')
+        self.lock = threading.Lock()
+
+    # Send one message, anything JSON can't take goes as its str()
+    def send(self, op, **fields):
+        fields['op'] = op
+        data = (json.dumps(fields, default=str) + '\n').encode('utf-8')
+        with self.lock:
+            self.conn.sendall(data)
+
+    # Next message, None once the other end is gone
+    def recv(self):
+        line = self.reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    # Wake up whoever is blocked in recv(), safe from any thread
+    def shutdown(self):
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self):
+        self.shutdown()
+        self.reader.close()
+        self.conn.close()
+
+# A worker as the coordinator sees it
+class _Worker:
+    def __init__(self, channel, name):
+        self.channel = channel
+        self.name = name
+        self.shard = None
+        self.order = []
+        self.outstanding = set()
+        self.done = 0
+        self.waiting = False
+        self.draining = False
+        self.stealable = False
+        self.since = None
+        self.last_seen = time.monotonic()
+
+    # Seconds this worker looks to need for what it has left
+    def remaining(self, now):
+        if not self.done or self.since is None:
+            return float('inf')
+        return len(self.outstanding) / (self.done / max(now - self.since, 1e-6))
+
+# Hands out shards and collects the results
+# Parameters:
+#   switches<Array[String]> = switch hostnames
+#   task<String> = key of TASKS
+#   token<String> = workers have to send this in their hello
+#   shard_size<Int> = switches per shard
+#   dead_after<Float> = seconds of silence before a busy worker is dropped
+#   progress<Progress> = progress.py status line, None for none
+class Coordinator:
+    def __init__(self, switches, task, token, shard_size=SHARD_SIZE, dead_after=DEAD_AFTER, progress=None):
+        self.switches = list(switches)
+        self.known = set(self.switches)
+        self.task = task
+        self.token = token
+        self.shard_size = shard_size
+        self.dead_after = dead_after
+        self.progress = progress
+        self.pending = collections.deque(self.switches)
+        self.results = {}
+        self.finished_by = collections.Counter()
+        self.workers = []
+        self.shards = 0
+        self.cond = threading.Condition()
+        self._stop = threading.Event()
+
+    def _say(self, line):
+        if self.progress is not None:
+            self.progress.note(line)
+        else:
+            print(line)
+
+    def complete(self):
+        return len(self.results) == len(self.switches)
+
+    # Listen for workers until every switch has an answer
+    # Parameters:
+    #   bind<String> = address to listen on, '' for all
+    #   port<Int> = TCP port, 0 for any free one
+    #   ready<Function> = called with the port once it's listening
+    #
+    # Return:
+    #   results<Dict{String: (String, Object)}> = switch -> (status, value) in list
+    #       order, same as fleet.run_fleet(). Errors come back as their message
+    def serve(self, bind='', port=PORT, ready=None):
+        listener = socket.create_server((bind, port))
+        listener.settimeout(1.0)
+        if ready is not None:
+            ready(listener.getsockname()[1])
+        accepter = threading.Thread(target=self._accept, args=(listener,), daemon=True)
+        accepter.start()
+        if self.progress is not None:
+            self.progress.begin(len(self.switches))
+        try:
+            with self.cond:
+                while not self.complete():
+                    self.cond.wait(1.0)
+                    self._check_dead()
+        finally:
+            self._stop.set()
+            accepter.join()
+            listener.close()
+            with self.cond:
+                workers = list(self.workers)
+                self.cond.notify_all()
+            for w in workers:
+                try:
+                    w.channel.send('done')
+                except OSError:
+                    pass
+                w.channel.shutdown()
+            if self.progress is not None:
+                self.progress.end()
+        return collections.OrderedDict((s, self.results[s]) for s in self.switches)
+
+    def _accept(self, listener):
+        while not self._stop.is_set():
+            try:
+                conn, addr = listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            conn.settimeout(None)
+            threading.Thread(target=self._handle, args=(conn, addr), daemon=True).start()
+
+    # Take switches back from workers that have gone quiet
+    # Called with self.cond held
+    def _check_dead(self):
+        now = time.monotonic()
+        for w in self.workers:
+            if not w.waiting and w.outstanding and now - w.last_seen > self.dead_after:
+                self._say("!Worker %s silent for %ds, taking its switches back" % (w.name, now - w.last_seen))
+                w.last_seen = now
+                w.channel.shutdown()
+
+    # One worker's connection, from hello to hang up
+    def _handle(self, conn, addr):
+        channel = Channel(conn)
+        w = None
+        try:
+            hello = channel.recv()
+            if not hello or hello.get('op') != 'hello' or \
+                    not hmac.compare_digest(str(hello.get('token', '')), self.token):
+                channel.send('error', reason='bad token')
+                return
+            w = _Worker(channel, hello.get('name') or '%s:%d' % addr[:2])
+            channel.send('welcome', task=self.task, heartbeat=HEARTBEAT)
+            with self.cond:
+                self.workers.append(w)
+            self._say("*Worker " + w.name + " joined")
+
+            while True:
+                msg = channel.recv()
+                if msg is None:
+                    break
+                with self.cond:
+                    w.last_seen = time.monotonic()
+                    op = msg.get('op')
+                    if op == 'result':
+                        self._result(w, msg)
+                    elif op == 'dropped':
+                        self._dropped(w, msg)
+                    elif op == 'ready':
+                        shard = self._next_shard(w)
+                        if shard is None:
+                            channel.send('done')
+                            break
+                        channel.send('shard', id=w.shard, switches=shard)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if w is not None:
+                with self.cond:
+                    if w in self.workers:
+                        self.workers.remove(w)
+                    lost = [s for s in w.order if s in w.outstanding]
+                    w.outstanding.clear()
+                    if lost:
+                        self.pending.extendleft(reversed(lost))
+                        for s in lost:
+                            if self.progress is not None:
+                                self.progress.returned(s)
+                    self.cond.notify_all()
+                if lost and not self.complete():
+                    self._say("!Worker %s gone, %d switches back in the queue" % (w.name, len(lost)))
+            channel.close()
+
+    # Called with self.cond held for everything below
+    def _result(self, w, msg):
+        s = msg.get('switch')
+        w.outstanding.discard(s)
+        w.done += 1
+        if s not in self.known or s in self.results:
+            return
+        self.results[s] = (msg.get('status', 'error'), msg.get('value'))
+        self.finished_by[w.name] += 1
+        if self.progress is not None:
+            self.progress.finished(s, self.results[s][0], self.results[s][1])
+        self.cond.notify_all()
+
+    def _dropped(self, w, msg):
+        # Answer to a drop for a shard the worker has since finished, it's got a new
+        # one now that nobody has asked anything about
+        if msg.get('id') != w.shard:
+            return
+        back = [s for s in msg.get('switches', []) if s in w.outstanding]
+        w.outstanding.difference_update(back)
+        w.draining = False
+        # What's left was already running, there's nothing more to take from it
+        w.stealable = False
+        self.pending.extendleft(reversed(back))
+        for s in back:
+            if self.progress is not None:
+                self.progress.returned(s)
+        self.cond.notify_all()
+
+    # Wait for a shard for an idle worker, taking work from a slow one if the queue
+    # is empty. None once everything is done
+    def _next_shard(self, w):
+        w.waiting = True
+        try:
+            while not self.complete():
+                if self.pending:
+                    shard = []
+                    while self.pending and len(shard) < self.shard_size:
+                        s = self.pending.popleft()
+                        if s not in self.results:
+                            shard.append(s)
+                    if not shard:
+                        continue
+                    self.shards += 1
+                    w.shard = self.shards
+                    w.order = shard
+                    w.outstanding.update(shard)
+                    w.stealable = True
+                    w.draining = False
+                    if w.since is None:
+                        w.since = time.monotonic()
+                    if self.progress is not None:
+                        for s in shard:
+                            self.progress.started(s)
+                    return shard
+                self._steal()
+                self.cond.wait(1.0)
+            return None
+        finally:
+            w.waiting = False
+            w.last_seen = time.monotonic()
+
+    # Ask the worker furthest from done for the back half of what it hasn't started
+    def _steal(self):
+        now = time.monotonic()
+        victims = [v for v in self.workers
+                if v.stealable and not v.draining and not v.waiting and len(v.outstanding) > 1]
+        if not victims:
+            return
+        victim = max(victims, key=lambda v: (v.remaining(now), len(v.outstanding)))
+        todo = [s for s in victim.order if s in victim.outstanding]
+        victim.draining = True
+        try:
+            victim.channel.send('drop', id=victim.shard, switches=todo[len(todo) // 2:])
+        except OSError:
+            victim.channel.shutdown()
+
+# The worker's end of a shard: fleet.py takes switches from it one at a time, so
+# switches the coordinator asks for back can still be taken out
+class _ShardQueue:
+    def __init__(self, switches):
+        self.queue = collections.deque(switches)
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def take(self):
+        with self.lock:
+            return self.queue.popleft() if self.queue else None
+
+    def done(self, switch):
+        pass
+
+    # Take switches out if they haven't started
+    # Return:
+    #   dropped<Array[String]> = the ones that were taken out
+    def drop(self, switches):
+        want = set(switches)
+        with self.lock:
+            dropped = [s for s in self.queue if s in want]
+            self.queue = collections.deque(s for s in self.queue if s not in want)
+            self.dropped += len(dropped)
+        return dropped
+
+# Sends each result to the coordinator as fleet.py finishes it
+class _Reporter:
+    def __init__(self, channel):
+        self.channel = channel
+        self.failed = 0
+
+    def begin(self, total, limiter=None):
+        pass
+
+    def started(self, switch):
+        pass
+
+    def finished(self, switch, status, value=None):
+        if status != 'ok':
+            self.failed += 1
+            value = str(value)
+        try:
+            self.channel.send('result', switch=switch, status=status, value=value)
+        except OSError:
+            # The reader thread sees the connection go and stops the shard
+            pass
+
+    def end(self):
+        pass
+
+# Be a worker until the coordinator says it's done
+# Parameters:
+#   address<String> = coordinator host[:port]
+#   token<String> = shared token
+#   name<String> = what the coordinator calls this worker
+#   limit<Int> = most switches in flight here, fleet.py's default if None
+def work(address, token, name=None, limit=None):
+    host, _, port = address.rpartition(':') if ':' in address else (address, '', '')
+    channel = Channel(socket.create_connection((host, int(port) if port else PORT)))
+    channel.send('hello', token=token, name=name or "%s-%d" % (socket.gethostname(), os.getpid()))
+    welcome = channel.recv()
+    if not welcome or welcome.get('op') != 'welcome':
+        print("!ERROR: Coordinator said no: " + str((welcome or {}).get('reason', 'hung up')))
+        sys.exit(1)
+    task = TASKS[welcome['task']]
+    print("*Connected to " + address + ", task is " + welcome['task'])
+    user, password = fiveguys.user_input() if task.login else ('', '')
+    job = task.make(user, password)
+
+    inbox = queue.Queue()
+    current = {'shard': None, 'id': None}
+    stop = threading.Event()
+
+    def reader():
+        while True:
+            try:
+                msg = channel.recv()
+            except (OSError, ValueError):
+                msg = None
+            if msg is None or msg.get('op') == 'done':
+                shard = current['shard']
+                if shard is not None and msg is None:
+                    shard.drop(list(shard.queue))
+                inbox.put(msg)
+                return
+            if msg.get('op') == 'shard':
+                inbox.put(msg)
+            elif msg.get('op') == 'drop':
+                # Only from the shard it was asked about, not whatever's running now
+                shard = current['shard'] if current['id'] == msg.get('id') else None
+                dropped = shard.drop(msg.get('switches', [])) if shard is not None else []
+                try:
+                    channel.send('dropped', id=msg.get('id'), switches=dropped)
+                except OSError:
+                    pass
+
+    def beat():
+        while not stop.wait(welcome.get('heartbeat', HEARTBEAT)):
+            try:
+                channel.send('beat')
+            except OSError:
+                return
+
+    threading.Thread(target=reader, daemon=True).start()
+    threading.Thread(target=beat, daemon=True).start()
+
+    limiter = fleet.AIMDLimiter(maximum=limit) if limit else fleet.AIMDLimiter()
+    total = 0
+    msg = None
+    try:
+        while True:
+            try:
+                channel.send('ready')
+            except OSError:
+                msg = None
+                break
+            msg = inbox.get()
+            if msg is None or msg.get('op') != 'shard':
+                break
+            shard = _ShardQueue(msg['switches'])
+            current['id'] = msg['id']
+            current['shard'] = shard
+            reporter = _Reporter(channel)
+            start = time.monotonic()
+            fleet.run_fleet(msg['switches'], job, limiter=limiter, progress=reporter, scheduler=shard)
+            current['shard'] = None
+            current['id'] = None
+            ran = len(msg['switches']) - shard.dropped
+            total += ran
+            print("-Shard %d: %d switches, %d failed, %d handed back, %.1fs" %
+                    (msg['id'], ran, reporter.failed, shard.dropped, time.monotonic() - start))
+    finally:
+        stop.set()
+        channel.close()
+    if msg is None:
+        print("!Lost the coordinator")
+    print("Done, %d switches from this worker." % total)
+
+# Pull '--name value' out of an argument list
+def _option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args):
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+    return default
+
+def usage():
+    print("!ERROR: usage: shard.py coordinator <task> <switch file> [--port N] [--shard N] [-q]")
+    print("               shard.py worker <coordinator host>[:port] [--name NAME] [--limit N]")
+    print("        tasks: " + ', '.join("%s (%s)" % (t, TASKS[t].about) for t in sorted(TASKS)))
+    sys.exit(1)
+
+# Main program logic
+#
+def main():
+    tracker = progress.Progress.from_argv()
+    args = sys.argv[1:]
+    try:
+        port = int(_option(args, '--port', PORT))
+        shard_size = int(_option(args, '--shard', SHARD_SIZE))
+        limit = _option(args, '--limit')
+        limit = int(limit) if limit else None
+    except ValueError:
+        usage()
+    name = _option(args, '--name')
+
+    if not args or args[0] not in ('coordinator', 'worker'):
+        usage()
+
+    if args[0] == 'worker':
+        if len(args) < 2:
+            usage()
+        token = os.environ.get(TOKEN_ENV) or getpass.getpass("Enter coordinator token: ")
+        work(args[1], token, name, limit)
+        return
+
+    if len(args) < 3 or args[1] not in TASKS:
+        usage()
+    switches = switchlist.hosts(args[2])
+    token = os.environ.get(TOKEN_ENV) or secrets.token_hex(8)
+    if not os.environ.get(TOKEN_ENV):
+        print("*Token for workers: " + token + " (or set " + TOKEN_ENV + ")")
+    coordinator = Coordinator(switches, args[1], token, shard_size, progress=tracker)
+    results = coordinator.serve(port=port, ready=lambda p: print(
+            "*%d switches, waiting for workers: ./shard.py worker %s:%d" % (len(switches), socket.gethostname(), p)))
+    TASKS[args[1]].merge(results)
+    for worker, count in coordinator.finished_by.most_common():
+        print("-%s: %d switches" % (worker, count))
+    print("Done with all switches.")
+    print("Exiting")
+
+# Execute the program
+if __name__ == "__main__":
+    main()
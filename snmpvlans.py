@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+
+# Title: snmpvlans.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Get VLAN IDs from switches over SNMP instead of logging in to run 'sh vl br'.
+#          Walks the Cisco VTP VLAN table (and the port membership table if asked)
+#          with SNMPv2c GETBULK. Every switch is queried at once from one UDP socket,
+#          so thousands of switches take about as long as the slowest one.
+#          Output is the same VLAN ID lists get_workstation_vlans() and get_vlans() give.
+#
+#          Usage: ./snmpvlans.py <switch file> [port]
+#          Writes workstation-vlans.txt in the same format as fiveguys.py, and every
+#          VLAN with its name to vlan-table.txt for vlanmap.py. Point the port
+#          at a local SNMP agent simulator (e.g. snmpsim on 1161) to test.
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import re
+import sys
+import socket
+import asyncio
+import getpass
+import itertools
+import switchlist
+
+# CISCO-VTP-MIB::vtpVlanName, indexed by <management domain>.<vlan id>
+VTP_VLAN_NAME = (1, 3, 6, 1, 4, 1, 9, 9, 46, 1, 3, 1, 1, 4)
+# CISCO-VLAN-MEMBERSHIP-MIB::vmVlan, indexed by ifIndex
+VM_VLAN = (1, 3, 6, 1, 4, 1, 9, 9, 68, 1, 2, 2, 1, 2)
+# IF-MIB::ifName, indexed by ifIndex
+IF_NAME = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 1)
+
+# Same patterns the CLI scripts hand to '| i'
+WORKSTATION_RE = re.compile(r'W-I|WKSTN|WKST|WKS|workstation|WSK')
+PUBLIC_RE = re.compile(r'PUB|DOT1X')
+
+# BER tags we send or get back
+INTEGER = 0x02
+OCTET_STRING = 0x04
+NULL = 0x05
+OID = 0x06
+SEQUENCE = 0x30
+GET_BULK = 0xA5
+RESPONSE = 0xA2
+# Varbind values that mean "nothing more here"
+END_OF_MIB = (0x80, 0x81, 0x82)
+
+# ---- BER encoding, just enough of it for GETBULK ----
+
+def _len(n):
+    if n < 0x80:
+        return bytes([n])
+    out = n.to_bytes((n.bit_length() + 7) // 8, 'big')
+    return bytes([0x80 | len(out)]) + out
+
+def _tlv(tag, value):
+    return bytes([tag]) + _len(len(value)) + value
+
+def _int(n):
+    return _tlv(INTEGER, n.to_bytes(max(1, (n.bit_length() + 8) // 8), 'big', signed=True))
+
+def _oid(oid):
+    out = bytearray([40 * oid[0] + oid[1]])
+    for arc in oid[2:]:
+        chunk = [arc & 0x7f]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7f))
+            arc >>= 7
+        out.extend(reversed(chunk))
+    return _tlv(OID, bytes(out))
+
+# Read one TLV
+# Return:
+#   (tag<Int>, value<Bytes>, next offset<Int>)
+def _read(data, pos):
+    tag = data[pos]
+    n = data[pos + 1]
+    pos += 2
+    if n & 0x80:
+        size = n & 0x7f
+        n = int.from_bytes(data[pos:pos + size], 'big')
+        pos += size
+    return tag, data[pos:pos + n], pos + n
+
+def _decode_oid(value):
+    first = value[0]
+    oid = [first // 40, first % 40]
+    arc = 0
+    for b in value[1:]:
+        arc = (arc << 7) | (b & 0x7f)
+        if not b & 0x80:
+            oid.append(arc)
+            arc = 0
+    return tuple(oid)
+
+def _decode_value(tag, value):
+    if tag == OID:
+        return _decode_oid(value)
+    if tag == OCTET_STRING:
+        return value.decode('utf-8', errors='replace')
+    if tag in END_OF_MIB or tag == NULL:
+        return None
+    # INTEGER, Counter32, Gauge32, TimeTicks, Counter64
+    return int.from_bytes(value, 'big', signed=(tag == INTEGER))
+
+# Build a GETBULK request
+# Parameters:
+#   community<String> = SNMP community
+#   request_id<Int> = id to match the response with
+#   oid<Tuple[Int]> = where to start
+#   repetitions<Int> = max-repetitions, how many rows to ask for at once
+#
+# Return:
+#   packet<Bytes>
+def build_getbulk(community, request_id, oid, repetitions=50):
+    varbinds = _tlv(SEQUENCE, _tlv(SEQUENCE, _oid(oid) + _tlv(NULL, b'')))
+    pdu = _tlv(GET_BULK, _int(request_id) + _int(0) + _int(repetitions) + varbinds)
+    return _tlv(SEQUENCE, _int(1) + _tlv(OCTET_STRING, community.encode()) + pdu)
+
+# Pull the request id, error status and varbinds out of a response
+# Return:
+#   (request_id<Int>, error<Int>, varbinds<Array[(Tuple[Int], Object, Int)]>)
+#   each varbind is (oid, value, value tag)
+def parse_response(data):
+    _, message, _ = _read(data, 0)
+    _, _, pos = _read(message, 0)          # version
+    _, _, pos = _read(message, pos)        # community
+    tag, pdu, _ = _read(message, pos)
+    if tag != RESPONSE:
+        raise ValueError("Not an SNMP response")
+    _, rid, pos = _read(pdu, 0)
+    _, err, pos = _read(pdu, pos)
+    _, _, pos = _read(pdu, pos)            # error index
+    _, vbl, _ = _read(pdu, pos)
+    varbinds = []
+    pos = 0
+    while pos < len(vbl):
+        _, vb, pos = _read(vbl, pos)
+        _, oid, p = _read(vb, 0)
+        vtag, value, _ = _read(vb, p)
+        varbinds.append((_decode_oid(oid), _decode_value(vtag, value), vtag))
+    return int.from_bytes(rid, 'big', signed=True), int.from_bytes(err, 'big'), varbinds
+
+# ---- Talking to the switches ----
+
+# One UDP socket shared by every request, responses matched up by request id
+class SnmpClient(asyncio.DatagramProtocol):
+    def __init__(self, community, timeout=2.0, retries=2):
+        self.community = community
+        self.timeout = timeout
+        self.retries = retries
+        self.waiting = {}
+        self.ids = itertools.count(1)
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            rid, err, varbinds = parse_response(data)
+        except (ValueError, IndexError):
+            return
+        future = self.waiting.pop(rid, None)
+        if future is not None and not future.done():
+            future.set_result((err, varbinds))
+
+    # Send one GETBULK and wait for the answer, retrying on timeout
+    async def getbulk(self, addr, oid, repetitions=50):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            rid = next(self.ids) & 0x7fffffff
+            future = loop.create_future()
+            self.waiting[rid] = future
+            self.transport.sendto(build_getbulk(self.community, rid, oid, repetitions), addr)
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self.waiting.pop(rid, None)
+        raise TimeoutError("No SNMP response from %s" % (addr[0],))
+
+    # Walk every row under an OID
+    # Return:
+    #   rows<Array[(Tuple[Int], Object)]> = (index after the base OID, value)
+    async def walk(self, addr, base):
+        rows = []
+        oid = base
+        while True:
+            err, varbinds = await self.getbulk(addr, oid)
+            if err:
+                raise ValueError("SNMP error %d from %s" % (err, addr[0]))
+            if not varbinds:
+                return rows
+            for vb_oid, value, tag in varbinds:
+                if tag in END_OF_MIB or vb_oid[:len(base)] != base:
+                    return rows
+                # Some IOS agents answer GETBULK with the same or an earlier OID,
+                # following that would walk the same rows forever
+                if vb_oid <= oid:
+                    raise ValueError("SNMP agent on %s went backwards at %s" %
+                            (addr[0], '.'.join(str(n) for n in vb_oid)))
+                rows.append((vb_oid[len(base):], value))
+                oid = vb_oid
+
+# Get one switch's VLAN table over SNMP
+# Parameters:
+#   client<SnmpClient> = shared client
+#   host<String> = switch hostname
+#   port<Int> = SNMP port
+#   members<Boolean> = also get which access ports are in which VLAN
+#
+# Return:
+#   vlans<Dict{Int: String}> = VLAN ID -> name, in VLAN ID order
+#   ports<Dict{String: Int}> = port name -> VLAN ID (empty unless members is True)
+async def get_switch_vlans(client, host, port=161, members=False):
+    loop = asyncio.get_running_loop()
+    info = await loop.getaddrinfo(host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+    addr = info[0][4]
+
+    vlans = {}
+    for index, name in await client.walk(addr, VTP_VLAN_NAME):
+        # Index is <management domain>.<vlan id>
+        vlans[index[-1]] = name or ''
+    vlans = dict(sorted(vlans.items()))
+
+    ports = {}
+    if members:
+        names = dict((index[0], name) for index, name in await client.walk(addr, IF_NAME))
+        for index, vlan in await client.walk(addr, VM_VLAN):
+            ports[names.get(index[0], str(index[0]))] = vlan
+
+    return vlans, ports
+
+# Get VLAN tables from a whole list of switches at once
+# Parameters:
+#   hosts<Array[String]> = switch hostnames
+#   community<String> = SNMP community
+#   port<Int> = SNMP port
+#   members<Boolean> = also get port membership
+#   concurrency<Int> = most switches being walked at once
+#   timeout<Float> = seconds to wait for each response
+#
+# Return:
+#   results<Dict{String: Object}> = host -> (vlans, ports) from get_switch_vlans(),
+#       or the exception if that switch failed
+async def collect(hosts, community, port=161, members=False, concurrency=500, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+            lambda: SnmpClient(community, timeout), local_addr=('0.0.0.0', 0))
+    # Lots of switches answering at once, don't let the kernel drop their replies
+    try:
+        transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+    except OSError:
+        pass
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(host):
+        async with limit:
+            try:
+                return await get_switch_vlans(client, host, port, members)
+            except Exception as e:
+                return e
+
+    try:
+        results = await asyncio.gather(*[one(h) for h in hosts])
+    finally:
+        transport.close()
+
+    return dict(zip(hosts, results))
+
+# Pick out VLAN IDs by name, like running 'sh vl br | i (...)'
+# Parameters:
+#   vlans<Dict{Int: String}> = VLAN ID -> name
+#   pattern<Regex> = WORKSTATION_RE, PUBLIC_RE, or your own
+#   suffix<String> = added to each ID ("p" for the fiveguys.py / got_voip.py lists)
+#
+# Return:
+#   ids<Array[String]> = matching VLAN IDs
+def match_vlans(vlans, pattern=WORKSTATION_RE, suffix=''):
+    return [str(v) + suffix for v, name in vlans.items() if pattern.search(name)]
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) == 1:
+        print("!ERROR: You need to specify the file containing switches")
+        sys.exit(1)
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 161
+
+    switches = switchlist.hosts(sys.argv[1])
+
+    try:
+        community = getpass.getpass("Enter SNMP community: ")
+    except KeyboardInterrupt:
+        print()
+        print("!ERROR: Caught KeyboardInterrupt, exiting")
+        sys.exit(1)
+
+    results = asyncio.run(collect(switches, community, port))
+
+    f = open('workstation-vlans.txt', 'w')
+    # Every VLAN and its name too, for vlanmap.py
+    table = open('vlan-table.txt', 'w')
+    for s in switches:
+        result = results[s]
+        if isinstance(result, Exception):
+            print("!ERROR: " + s + ": " + str(result))
+            continue
+        for v, name in result[0].items():
+            table.write(s + "\t" + str(v) + "\t" + name + "\n")
+        vlans = match_vlans(result[0], suffix='p')
+        # Just in case there are no workstation vlans on the switch, skip it
+        if len(vlans) == 0:
+            print("!No workstation VLANs, skipping switch " + s)
+            continue
+        f.write(s + " " + ','.join(vlans) + '\n')
+    f.close()
+    table.close()
+
+    print("Done with all switches.")
+    print("Exiting")
+
+# Execute the program
+if __name__ == "__main__":
+    main()
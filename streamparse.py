@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# Title: streamparse.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Parse command output line by line while it's still coming off the switch,
+#          instead of waiting for send_command() to hand back one big string and then
+#          calling splitlines(). A parser can say it has seen enough and stop early,
+#          e.g. the VOIP check only needs the first matching line.
+#
+#          Over an exec channel, stopping early closes the channel and the switch stops
+#          sending. Over netmiko's interactive shell the rest of the output still has
+#          to be read so the next command starts at a clean prompt, but it's thrown
+#          away without being parsed.
+#
+# Dependencies:
+#          Netmiko python3 module (the ssh object passed in)
+
+# Import statements
+import time
+import pipeline
+
+# Split a stream of text chunks into lines as they arrive
+# Parameters:
+#   chunks<Iterator[String]> = pieces of output in the order they were read
+#
+# Return:
+#   lines<Iterator[String]> = complete lines without line endings
+def iter_lines(chunks):
+    partial = ''
+    for chunk in chunks:
+        partial += chunk.replace('\r', '')
+        # Everything up to the last newline is complete, the rest waits for more data
+        if '\n' in partial:
+            done, partial = partial.rsplit('\n', 1)
+            for line in done.split('\n'):
+                yield line
+    if partial:
+        yield partial
+
+# Read a command's output from netmiko's interactive shell as it arrives
+# If the consumer stops early, the rest of the output is drained (not parsed) so the
+# shell is back at the prompt for the next command.
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   cmd<String> = command to run
+#   timeout<Float> = seconds to wait with nothing arriving
+#
+# Return:
+#   lines<Iterator[String]> = output lines, without the echoed command and prompt
+def stream_command(ssh, cmd, timeout=60):
+    prompt_re = pipeline.prompt_regex(ssh)
+    ssh.write_channel(cmd + getattr(ssh, 'RETURN', '\n'))
+
+    state = {'done': False, 'tail': ''}
+
+    def chunks():
+        deadline = time.monotonic() + timeout
+        while not state['done']:
+            chunk = ssh.read_channel()
+            if not chunk:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Timed out waiting for output of: " + cmd)
+                time.sleep(0.02)
+                continue
+            deadline = time.monotonic() + timeout
+            # The prompt at the start of the last line means the command is finished
+            tail = (state['tail'] + chunk).replace('\r', '').rsplit('\n', 1)[-1]
+            state['tail'] = tail
+            if prompt_re.match(tail) and tail.rstrip().endswith(('#', '>')):
+                state['done'] = True
+            yield chunk
+
+    first = True
+    lines = iter_lines(chunks())
+    try:
+        for line in lines:
+            # First line is the command the switch echoed back
+            if first:
+                first = False
+                continue
+            if state['done'] and prompt_re.match(line):
+                continue
+            yield line
+    finally:
+        # Consumer stopped early, throw away the rest until the prompt shows up
+        for _ in lines:
+            pass
+
+# Read a command's output from its own exec channel as it arrives
+# Stopping early closes the channel, so the switch stops sending right away.
+# Parameters:
+#   transport<paramiko.Transport> = authenticated SSH transport
+#   cmd<String> = command to run
+#   timeout<Float> = seconds to wait for each read
+#
+# Return:
+#   lines<Iterator[String]> = output lines
+def stream_exec(transport, cmd, timeout=60):
+    chan = transport.open_session(timeout=timeout)
+    try:
+        chan.settimeout(timeout)
+        chan.exec_command(cmd)
+
+        def chunks():
+            while True:
+                data = chan.recv(65536)
+                if not data:
+                    break
+                yield data.decode('utf-8', errors='replace')
+
+        for line in iter_lines(chunks()):
+            yield line
+    finally:
+        chan.close()
+
+# Feed lines to a parser until it says stop or the output runs out
+# Parameters:
+#   lines<Iterator[String]> = from stream_command() or stream_exec()
+#   parser<Object> = anything with feed(line) -> True to stop, and result()
+#
+# Return:
+#   whatever parser.result() returns
+def parse(lines, parser):
+    try:
+        for line in lines:
+            if parser.feed(line):
+                break
+    finally:
+        if hasattr(lines, 'close'):
+            lines.close()
+    return parser.result()
+
+# Parser that stops at the first line containing some text
+# Parameters:
+#   needle<String> = text to look for
+class FirstMatch:
+    def __init__(self, needle):
+        self.needle = needle
+        self.match = ''
+
+    def feed(self, line):
+        if self.needle in line:
+            self.match = line
+            return True
+        return False
+
+    # The matching line, empty if there wasn't one
+    def result(self):
+        return self.match
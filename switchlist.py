@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# Title: switchlist.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Read a switch file once, line by line, and hand back every switch exactly
+#          once. A switch that's in the file more than once (or in different case)
+#          would otherwise mean logging in to it more than once. When the rows carry
+#          extra fields (pub_and_ip_adapted.py's 'switch,vlan id'), all the rows for
+#          one switch become one job with every set of fields, so it's one login.
+#
+#          Formats (can be mixed in one file):
+#               sw-1                    plain, one hostname per line
+#               sw-1,361,bldg-A         CSV, hostname first, quoting works like Excel's
+#               [bldg-A]                grouped, the hosts under a [group] line carry it
+#               sw-1                        as Job.group, not as a column (so 'bldg=group'
+#                                           works for the fiveguys.py grouping rules)
+#          Blank lines and lines starting with '#' are skipped, and a first row that
+#          starts with 'switch', 'host' or 'hostname' is taken as a header.
+#
+#          Usage: ./switchlist.py <switch file>
+#               prints one line per switch with the fields from all its rows
+#
+# Dependencies:
+#          None outside the standard library
+
+# Import statements
+import csv
+import sys
+import collections
+
+# First column names that mean the first row is a header
+HEADERS = ('switch', 'host', 'hostname')
+
+# One switch and everything the file says about it
+#   host -- hostname as first written in the file
+#   row -- [host] + the fields of its first row, what scheduler.py groups on
+#   params -- the fields after the hostname from every row, duplicates dropped
+#   group -- the [group] the switch is listed under, None if it isn't under one
+Job = collections.namedtuple('Job', 'host row params group')
+
+# Read a switch file one row at a time
+# Parameters:
+#   path<String> = switch file
+#
+# Return:
+#   rows<Generator[(Array[String], String)]> = fields of each row, hostname first,
+#       and the [group] it's under (None if it isn't under one)
+def iter_rows(path):
+    f = open(path, 'r', newline='')
+    try:
+        first = True
+        group = None
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                group = line[1:-1].strip() or None
+                continue
+            row = [c.strip() for c in next(csv.reader([line], skipinitialspace=True))]
+            if not row or not row[0]:
+                continue
+            if first and row[0].lower() in HEADERS:
+                first = False
+                continue
+            first = False
+            yield row, group
+    finally:
+        f.close()
+
+# Read a switch file into one job per switch
+# Parameters:
+#   path<String> = switch file
+#   report<Function> = where the duplicate summary goes, None for nowhere
+#
+# Return:
+#   jobs<Array[Job]> = in the order each switch first shows up
+def load(path, report=print):
+    jobs = collections.OrderedDict()
+    seen = {}
+    rows = 0
+    for row, group in iter_rows(path):
+        rows += 1
+        key = row[0].lower()
+        params = tuple(row[1:])
+        if key not in jobs:
+            jobs[key] = Job(row[0], row, [], group)
+            seen[key] = set()
+        if params and params not in seen[key]:
+            seen[key].add(params)
+            jobs[key].params.append(params)
+    if report is not None and rows > len(jobs):
+        report("-%d rows in %s, %d switches: %d repeated rows folded in" %
+                (rows, path, len(jobs), rows - len(jobs)))
+    return list(jobs.values())
+
+# Just the hostnames, each one once
+def hosts(path, report=print):
+    return [job.host for job in load(path, report)]
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) == 1:
+        print("!ERROR: You need to specify the file containing switches")
+        sys.exit(1)
+    for job in load(sys.argv[1]):
+        print(job.host + (" [" + job.group + "]" if job.group else '') +
+                (" " + ' '.join(','.join(p) for p in job.params) if job.params else ''))
+
+# Execute the program
+if __name__ == "__main__":
+    main()
@@ -17,11 +17,15 @@
 #               Install using the following: sudo -H pip3 install netmiko
 
 # Import statements
-import os
 import sys
 import socket
-import netmiko
 import getpass
+import multichan
+import runarchive
+import switchlist
+
+# How many exec channels to use for the per-port queries (1 is the old serial way)
+PORT_CHANNELS = 4
 
 # Get keyboard input for username and password
 # Return:
@@ -63,6 +67,8 @@ def check_host(host):
 def get_workstation_vlans(switch, user, password):
     # COMMAND THAT WILL RUN ON SWITCH
     cmd = "sh vl br | i (W-I|WKSTN)"
+    # netmiko takes a while to load, so it's only imported once we log in
+    import netmiko
     # Build the ssh object
     # Here is where we can specify anything specific about the switch
     #   device type, secrete phrase, etc
@@ -103,10 +109,13 @@ def get_workstation_vlans(switch, user, password):
 #   user<String> = Username to use when connecting
 #   password<String> = Password
 #   ports<Array[String]> = List of access ports
+#   channels<Int> = run the queries over this many exec channels at once (multichan.py)
 #
 # Return:
 #   result<String> = Running config for list of access ports
-def get_running_config(switch, user, password, ports):
+def get_running_config(switch, user, password, ports, channels=1):
+    # netmiko takes a while to load, so it's only imported once we log in
+    import netmiko
     # Build the ssh object
     # Here is where we can specify anything specific about the switch
     #   device type, secrete phrase, etc
@@ -120,9 +129,16 @@ def get_running_config(switch, user, password, ports):
     ssh.enable()
     result = ssh.find_prompt() + "\n"
 
-    for p in ports:
-        # COMMAND THAT WILL RUN ON SWITCH
-        result += ssh.send_command("sh run int " + p + " | inc (max|desc|access|max|speed|duplex)|interface", delay_factor=2)
+    if channels > 1:
+        config = multichan.get_running_config(ssh, ports, channels)
+    else:
+        config = []
+        for p in ports:
+            # COMMAND THAT WILL RUN ON SWITCH
+            config.append(ssh.send_command("sh run int " + p + " | inc (max|desc|access|max|speed|duplex)|interface", delay_factor=2))
+
+    for c in config:
+        result += c
         result += '\n\n'
 
     # Close connection
@@ -145,13 +161,8 @@ def main():
     # Make sure we're ready to go
     go = input("Are you ready to get started? (y/N): ").lower()
     if go == 'y':
-        # Empty array for switches
-        switches = []
-        # Open file with switch hostnames
-        switch_file = sys.argv[1]
-        f = open(switch_file, 'r')
-        for s in f:
-            switches.append(s.strip())
+        # Each switch once, however many times it's in the file
+        switches = switchlist.hosts(sys.argv[1])
         # Get username and password for switches from keyboard
         user, password = user_input()
         print()
@@ -161,8 +172,6 @@ def main():
             # Let us know which one we're working with
             print("!Current Switch: " + s)
             if (check_host(s)):
-                # Make a dir for each switch as each switch will generate a few output files
-                os.mkdir(s)
                 # Switch hostname to IP address
                 ip = socket.gethostbyname(s)
 
@@ -174,29 +183,16 @@ def main():
                 # Get the running config for access ports in workstation VLANs and store in array
                 # This is before any changes have been made to the switch
                 print("*Building config...")
-                config = get_running_config(ip, user, password, ports)
-                print("*Done")
-
-                # Create new file and write workstation VLAN IDs to it
-                print("*Writing workstation VLAN IDs to file " + s + "-vlans.txt ...")
-                f = open(s + "/" + s + '-vlans.txt', 'w')
-                f.write('\n'.join(vlans))
-                f.close()
-                print("*Done")
-
-                # Create new file and write workstation access ports to it
-                print("*Writing workstation access ports to file " + s + "-ports.txt ...")
-                f = open(s + "/" + s + '-ports.txt', 'w')
-                f.write('\n'.join(ports))
-                f.close()
+                config = get_running_config(ip, user, password, ports, PORT_CHANNELS)
                 print("*Done")
 
-                # Create a new file and write the running config of access ports to it
-                # No changes have been made to the switch yet
-                print("*Writing config before changes to file " + s + "-before.txt ...")
-                f = open(s + "/" + s + '-before.txt', 'w')
-                f.write(config)
-                f.close()
+                # Save workstation VLAN IDs, access ports and their running config
+                # to the run archive (runarchive.py), no changes have been made yet
+                print("*Saving " + s + "-vlans, -ports and -before to " + runarchive.ARCHIVE_FILE + " ...")
+                runarchive.write(s, 'vlans', '\n'.join(vlans))
+                runarchive.write(s, 'ports', '\n'.join(ports))
+                runarchive.write(s, 'before', config)
+                runarchive.flush()
                 print("*Done")
 
                 # Done with the 'before' information
@@ -216,7 +212,7 @@ def main():
                 print()
                 # Gives the user a moment to review the output files that were generated, and that everything went okay
                 # Make sure we're ready for the next switch
-                print("*Review the output files if needed. No changes have been made yet")
+                print("*Review the output if needed (./runarchive.py show " + s + "). No changes have been made yet")
                 go = input(">Ready for the next switch? (y/N): ").lower()
                 if go != 'y':
                     print("!ERROR: User canceled")
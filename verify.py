@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# Title: verify.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Check that the lines we pushed to a switch actually took, with one filtered
+#          'sh run | i' per switch instead of re-running 'sh run int' on every port.
+#          Each port gets a pass or fail, and only ports that fail get their full
+#          interface config pulled so we can see what went wrong.
+#
+# Dependencies:
+#          Netmiko python3 module (the ssh object passed in)
+
+# Import statements
+import re
+import confparse
+import runarchive
+
+# Characters that mean something in an IOS regex
+IOS_SPECIAL = re.compile(r'([.*+?()\[\]^$|\\_])')
+# 'power inline' lines that set the port's mode, anything but plain 'auto' (the
+# default, never shown) means 'power inline auto' didn't take. Lines like
+# 'power inline port priority high' or 'power inline police' don't count
+POWER_MODE = 'power inline (never|static|consumption|auto max)'
+POWER_MODE_RE = re.compile('^' + POWER_MODE)
+
+# Build the one command that pulls every changed line (and the interface headers)
+# Parameters:
+#   blocks<Array[Array[String]]> = per-port command blocks, 'interface X' first
+#
+# Return:
+#   cmd<String> = e.g. 'sh run | i ^interface|priority-queue out|source template X'
+def verify_command(blocks):
+    lines = []
+    for block in blocks:
+        for c in block[1:]:
+            # 'power inline auto' is the default and never shows up, look for the
+            # other power modes so we can catch it set to something else
+            c = POWER_MODE if c == 'power inline auto' else IOS_SPECIAL.sub(r'\\\1', c)
+            if c not in lines:
+                lines.append(c)
+    return 'sh run | i ^interface|' + '|'.join(lines)
+
+# Group the output of verify_command() by interface
+# Parameters:
+#   output<String> = command output
+#
+# Return:
+#   found<Dict{String: Set[String]}> = long interface name -> lines under it
+def parse_output(output):
+    found = {}
+    current = None
+    for line in output.replace('\r', '').split('\n'):
+        if line.startswith('interface '):
+            current = found.setdefault(line.split(None, 1)[1].strip(), set())
+        elif current is not None and line.strip():
+            current.add(line.strip())
+    return found
+
+# Which of a port's changed lines aren't on the switch
+# Parameters:
+#   block<Array[String]> = the port's command block, 'interface X' first
+#   found<Dict{String: Set[String]}> = from parse_output()
+#
+# Return:
+#   missing<Array[String]> = lines that didn't take, empty if the port passed
+def check_port(block, found):
+    have = found.get(confparse.long_port_name(block[0].split(None, 1)[1].strip()), set())
+    missing = []
+    for c in block[1:]:
+        if c == 'power inline auto':
+            if any(POWER_MODE_RE.match(l) for l in have):
+                missing.append(c)
+        elif c not in have:
+            missing.append(c)
+    return missing
+
+# Verify every port we changed on one switch
+# Parameters:
+#   ssh<Netmiko> = Netmiko SSH object - this is the connection to the switch
+#   blocks<Array[Array[String]]> = per-port command blocks that were pushed
+#
+# Return:
+#   results<Dict{String: Array[String]}> = port -> missing lines (empty list is a pass)
+#   failed<Dict{String: String}> = port -> full interface config, failed ports only
+def verify_switch(ssh, blocks):
+    if not blocks:
+        return {}, {}
+    found = parse_output(ssh.send_command(verify_command(blocks), delay_factor=2))
+    results = {}
+    failed = {}
+    for block in blocks:
+        port = block[0].split(None, 1)[1].strip()
+        results[port] = check_port(block, found)
+        if results[port]:
+            failed[port] = ssh.send_command("sh run int " + port, delay_factor=2)
+    return results, failed
+
+# Save the per-port report and the failed ports' config to the run archive
+# Parameters:
+#   switch<String> = switch hostname
+#   results<Dict{String: Array[String]}> = from verify_switch()
+#   failed<Dict{String: String}> = from verify_switch()
+#
+# Return:
+#   passed<Int>, failed<Int> = port counts
+def write_report(switch, results, failed):
+    report = []
+    for port, missing in results.items():
+        if missing:
+            report.append(port + ": FAIL missing " + '; '.join(missing) + '\n')
+        else:
+            report.append(port + ": PASS\n")
+    runarchive.write(switch, 'verify', ''.join(report))
+    runarchive.write(switch, 'after', '\n\n'.join(failed.values()))
+
+    return len(results) - len(failed), len(failed)
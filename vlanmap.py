@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+# Title: vlanmap.py
+# Date: October 19, 2026 <10/19/26>
+#
+# Purpose: Answer cross-switch VLAN questions ("which switches have VLAN 361 but no
+#          workstation VLAN", "how many switches carry each VLAN") without string work.
+#          Every switch's VLANs become a 4096-bit bitmap, one bit per VLAN ID, and the
+#          bitmaps for the whole fleet are stacked into one matrix so a question is a
+#          few bitwise operations over all switches at once.
+#
+#          Reads:
+#               vlan-table.txt (snmpvlans.py) -- every VLAN and its name, workstation
+#                   and public VLANs are picked out by name
+#               workstation-vlans.txt (fiveguys.py / snmpvlans.py) -- workstation VLANs
+#
+#          Usage:
+#               ./vlanmap.py query <term> [term ...]
+#                   switches matching every term. A term is a VLAN ID (has that VLAN),
+#                   a layer name (wkstn, public: has any VLAN of that kind), layer:ID
+#                   (that VLAN is of that kind), and any term can start with ! to negate
+#                   e.g. ./vlanmap.py query 361 !wkstn
+#               ./vlanmap.py histogram [layer]
+#                   how many switches carry each VLAN, written to vlan-usage.txt
+#
+# Dependencies:
+#          NumPy python3 module (optional, a slower pure Python fallback is used without it)
+
+# Import statements
+import os
+import sys
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import snmpvlans
+
+# VLAN IDs go 0-4095
+VLAN_BITS = 4096
+# Written by snmpvlans.py, one 'switch<TAB>vlan id<TAB>name' per line
+TABLE_FILE = 'vlan-table.txt'
+# Written by fiveguys.py and snmpvlans.py, 'switch 10p,20p'
+WORKSTATION_FILE = 'workstation-vlans.txt'
+# Where the histogram goes
+USAGE_FILE = 'vlan-usage.txt'
+# Layer name -> VLAN name pattern, 'all' is every VLAN
+LAYERS = {
+        'wkstn': snmpvlans.WORKSTATION_RE,
+        'public': snmpvlans.PUBLIC_RE}
+
+# VLAN bitmaps for a whole fleet, one matrix per layer
+#
+# With NumPy each layer is a (switches x 512) uint8 matrix, VLAN v is bit v & 7 of
+# byte v >> 3. Without it each layer is stored the other way around, one Python int
+# per VLAN with bit i set for switch i, which keeps the same questions to a handful
+# of big-int operations.
+#
+# Switch masks (what has() and has_any() give back) are NumPy bool arrays or Python
+# ints. Combine them with & and |, and use invert() for 'not'.
+#
+# Parameters:
+#   vlans<Dict{String: Dict{String: Iterable}}> = layer -> switch -> VLAN IDs
+class VlanMatrix:
+    def __init__(self, vlans):
+        switches = set()
+        for per_switch in vlans.values():
+            switches.update(per_switch)
+        self.switches = sorted(switches)
+        self.row = dict((s, i) for i, s in enumerate(self.switches))
+        self.layers = {}
+        for layer, per_switch in vlans.items():
+            self.layers[layer] = self._build(per_switch)
+
+    def _build(self, per_switch):
+        n = len(self.switches)
+        rows = []
+        cols = []
+        for s, ids in per_switch.items():
+            for v in ids:
+                v = int(str(v).rstrip('p'))
+                if 0 <= v < VLAN_BITS:
+                    rows.append(self.row[s])
+                    cols.append(v)
+
+        if numpy is not None:
+            layer = numpy.zeros((n, VLAN_BITS // 8), dtype=numpy.uint8)
+            rows = numpy.array(rows, dtype=numpy.intp)
+            cols = numpy.array(cols, dtype=numpy.intp)
+            numpy.bitwise_or.at(layer, (rows, cols >> 3), (1 << (cols & 7)).astype(numpy.uint8))
+            return layer
+
+        columns = {}
+        for i, v in zip(rows, cols):
+            columns.setdefault(v, bytearray((n + 7) // 8))[i >> 3] |= 1 << (i & 7)
+        return dict((v, int.from_bytes(b, 'little')) for v, b in columns.items())
+
+    # Mask of every switch
+    def everything(self):
+        if numpy is not None:
+            return numpy.ones(len(self.switches), dtype=bool)
+        return (1 << len(self.switches)) - 1
+
+    # Switches that don't match a mask
+    def invert(self, mask):
+        if numpy is not None:
+            return ~mask
+        return self.everything() & ~mask
+
+    # Switches that have a VLAN in a layer
+    def has(self, vlan, layer='all'):
+        m = self.layers[layer]
+        if numpy is not None:
+            return (m[:, vlan >> 3] >> (vlan & 7) & 1).astype(bool)
+        return m.get(vlan, 0)
+
+    # Switches that have any VLAN in a layer
+    def has_any(self, layer):
+        m = self.layers[layer]
+        if numpy is not None:
+            return m.any(axis=1)
+        mask = 0
+        for col in m.values():
+            mask |= col
+        return mask
+
+    # Number of switches in a mask
+    def count(self, mask):
+        if numpy is not None:
+            return int(mask.sum())
+        return bin(mask).count('1')
+
+    # Switch names in a mask
+    def switches_in(self, mask):
+        if numpy is not None:
+            return [self.switches[i] for i in numpy.flatnonzero(mask)]
+        return [s for i, s in enumerate(self.switches) if mask >> i & 1]
+
+    # How many switches carry each VLAN
+    # Parameters:
+    #   layer<String> = which layer to count
+    #   mask<Mask> = only count these switches, None for all
+    #
+    # Return:
+    #   counts<Array[Int]> = switch count for VLAN 0 to 4095
+    def histogram(self, layer='all', mask=None):
+        m = self.layers[layer]
+        if numpy is not None:
+            if mask is not None:
+                m = m[mask]
+            counts = numpy.zeros(VLAN_BITS, dtype=numpy.int64)
+            # A few thousand rows at a time so unpacking doesn't blow up memory
+            for start in range(0, len(m), 4096):
+                counts += numpy.unpackbits(m[start:start + 4096], axis=1,
+                        bitorder='little').sum(axis=0, dtype=numpy.int64)
+            return [int(c) for c in counts]
+        counts = [0] * VLAN_BITS
+        for v, col in m.items():
+            counts[v] = self.count(col if mask is None else col & mask)
+        return counts
+
+    # Switches matching every term of a query, see the usage at the top
+    # Parameters:
+    #   terms<Array[String]> = e.g. ['361', '!wkstn']
+    #
+    # Return:
+    #   mask<Mask>
+    def query(self, terms):
+        mask = self.everything()
+        for term in terms:
+            negate = term.startswith('!')
+            term = term.lstrip('!')
+            layer, _, vlan = term.rpartition(':')
+            if not layer and not vlan.isdigit():
+                layer, vlan = vlan, ''
+            if (layer or 'all') not in self.layers or \
+                    (vlan and (not vlan.isdigit() or int(vlan) >= VLAN_BITS)):
+                raise ValueError("Don't know what '" + term + "' means, layers are " +
+                        ', '.join(sorted(self.layers)))
+            if vlan:
+                found = self.has(int(vlan), layer or 'all')
+            else:
+                found = self.has_any(layer)
+            mask = mask & (self.invert(found) if negate else found)
+        return mask
+
+# Read the VLAN lists the collectors leave behind
+# Parameters:
+#   table<String> = snmpvlans.py vlan table
+#   workstation<String> = fiveguys.py / snmpvlans.py workstation VLAN list
+#
+# Return:
+#   vlans<Dict{String: Dict{String: Array[Int]}}> = layer -> switch -> VLAN IDs
+def load_vlans(table=TABLE_FILE, workstation=WORKSTATION_FILE):
+    vlans = {'all': {}}
+    for layer in LAYERS:
+        vlans[layer] = {}
+
+    if os.path.exists(table):
+        f = open(table)
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 2 or not fields[1].isdigit():
+                continue
+            s, v, name = fields[0], int(fields[1]), '\t'.join(fields[2:])
+            vlans['all'].setdefault(s, []).append(v)
+            for layer, pattern in LAYERS.items():
+                if pattern.search(name):
+                    vlans[layer].setdefault(s, []).append(v)
+        f.close()
+
+    if os.path.exists(workstation):
+        f = open(workstation)
+        for line in f:
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            ids = [int(v.rstrip('p')) for v in fields[1].split(',') if v.rstrip('p').isdigit()]
+            have = vlans['wkstn'].setdefault(fields[0], [])
+            have.extend(v for v in ids if v not in have)
+            known = vlans['all'].setdefault(fields[0], [])
+            known.extend(v for v in ids if v not in known)
+        f.close()
+
+    return vlans
+
+# Main program logic
+#
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('query', 'histogram') or \
+            (sys.argv[1] == 'query' and len(sys.argv) < 3):
+        print("!ERROR: usage: vlanmap.py query <term> [term ...]")
+        print("               vlanmap.py histogram [layer]")
+        sys.exit(1)
+
+    if not os.path.exists(TABLE_FILE) and not os.path.exists(WORKSTATION_FILE):
+        print("!ERROR: No " + TABLE_FILE + " or " + WORKSTATION_FILE + ", run snmpvlans.py or fiveguys.py first")
+        sys.exit(1)
+
+    start = time.time()
+    m = VlanMatrix(load_vlans())
+    print("*Loaded %d switches in %.1f ms%s" % (len(m.switches), (time.time() - start) * 1000,
+            '' if numpy is not None else ' (no NumPy, using the slower fallback)'))
+
+    if sys.argv[1] == 'query':
+        start = time.time()
+        try:
+            mask = m.query(sys.argv[2:])
+        except ValueError as e:
+            print("!ERROR: " + str(e))
+            sys.exit(1)
+        took = time.time() - start
+        for s in m.switches_in(mask):
+            print(s)
+        print("-%d of %d switches match in %.1f ms" % (m.count(mask), len(m.switches), took * 1000))
+        return
+
+    layer = sys.argv[2] if len(sys.argv) > 2 else 'all'
+    if layer not in m.layers:
+        print("!ERROR: No layer " + layer + ", layers are " + ', '.join(sorted(m.layers)))
+        sys.exit(1)
+    counts = m.histogram(layer)
+    f = open(USAGE_FILE, 'w')
+    for v, c in enumerate(counts):
+        if c:
+            f.write("%d %d\n" % (v, c))
+    f.close()
+    top = sorted((c, v) for v, c in enumerate(counts) if c)[::-1][:20]
+    for c, v in top:
+        print("  VLAN %4d  %6d switches" % (v, c))
+    print("*Full histogram written to " + USAGE_FILE)
+
+# Execute the program
+if __name__ == "__main__":
+    main()